@@ -1,5 +1,6 @@
 from fastapi import APIRouter
-from .endpoints import candidates
+from .endpoints import candidates, skills
 
 api_router = APIRouter()
 api_router.include_router(candidates.router, prefix="/candidates", tags=["candidates"])
+api_router.include_router(skills.router, prefix="/skills", tags=["skills"])
@@ -1,156 +1,529 @@
-import json
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+import base64
+import hashlib
+import orjson
+from datetime import datetime
+from decimal import Decimal
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Request
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from app import crud, schemas
-from app.core.db import get_db
-from app.services.publisher import publisher, RabbitMQProducer
+from app import schemas
+from app.crud import candidate as crud_candidate, candidate_async as crud_async
+from app.core.config import BULK_IMPORT_CHUNK_SIZE, BULK_DELETE_CHUNK_SIZE
+from app.models.candidate import SkillKind, Status
+from app.core.db import AsyncSessionLocal, get_async_db, get_async_read_db, read_router
+from app.services.outbox_relay import outbox_relay, OutboxRelay
+from app.services.candidate_cache import candidate_cache
+from app.services.file_service import file_service, FileServiceClient, FileServiceError
+from app.services.candidate_ranking import candidate_ranking, CandidateRanking, RequiredSkill
+from app.services.skill_index import skill_index
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # --- SUPPORT FUNCTION ---
-async def get_publisher():
-    return publisher
+async def get_outbox_relay():
+    return outbox_relay
 
-async def handle_update(db_candidate, candidate_in, db, pub):
-    updated_candidate = crud.update_candidate(
-        db=db, db_candidate=db_candidate, candidate_in=candidate_in
+async def get_file_service():
+    return file_service
+
+async def get_candidate_ranking():
+    return candidate_ranking
+
+async def _download_url(files: FileServiceClient, file_id: UUID) -> str:
+    try:
+        return await files.get_download_url(file_id)
+    except FileServiceError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+def _encode_cursor(document) -> str:
+    raw = f"{document.created_at.isoformat()}|{document.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, candidate_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(candidate_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+def _json_response(payload: bytes, status_code: int = status.HTTP_200_OK, headers: dict | None = None) -> Response:
+    return Response(content=payload, status_code=status_code, headers=headers, media_type="application/json")
+
+async def _iter_bulk_chunks(request: Request):
+    # NDJSON bodies are consumed line by line so memory stays bounded by the chunk size;
+    # a JSON array has to be parsed whole.
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        chunk, buffer, index = [], b"", 0
+        async for data in request.stream():
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    chunk.append((index, line))
+                    index += 1
+                if len(chunk) >= BULK_IMPORT_CHUNK_SIZE:
+                    yield chunk
+                    chunk = []
+        if buffer.strip():
+            chunk.append((index, buffer))
+        if chunk:
+            yield chunk
+        return
+
+    try:
+        items = orjson.loads(await request.body())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Body must be a JSON array or NDJSON"
+        )
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Body must be a JSON array or NDJSON"
+        )
+    for start in range(0, len(items), BULK_IMPORT_CHUNK_SIZE):
+        yield list(enumerate(items[start:start + BULK_IMPORT_CHUNK_SIZE], start=start))
+
+def _search_filters(
+    skills: list[str] = Query([]),
+    skill_kind: SkillKind | None = None,
+    min_skill_level: int | None = Query(None, ge=1, le=5),
+    location: str | None = Query(None, min_length=3),
+    min_experience: Decimal | None = Query(None, ge=0, le=65),
+    max_experience: Decimal | None = Query(None, ge=0, le=65),
+    work_modes: list[str] = Query([]),
+    status: Status | None = None,
+) -> schemas.CandidateSearchFilters:
+    return schemas.CandidateSearchFilters(
+        skills=skills,
+        skill_kind=skill_kind,
+        min_skill_level=min_skill_level,
+        location=location,
+        min_experience=min_experience,
+        max_experience=max_experience,
+        work_modes=work_modes,
+        status=status,
     )
-    pydantic_candidate = schemas.Candidate.model_validate(updated_candidate)
-    await pub.publish_message(
-        routing_key="candidate.updated",
-        message_body=pydantic_candidate.model_dump_json().encode()
+
+def _update_profile(candidate_in: schemas.CandidateUpdate) -> str:
+    # The skill diff needs the current skills; other child lists are compared
+    # only when sent, and then load on access.
+    if candidate_in.skills is not None:
+        return crud_async.LOAD_SKILLS
+    return crud_async.LOAD_HEADER
+
+async def handle_update(db_candidate, candidate_in, db, relay):
+    updated_candidate, payload = await crud_async.update_candidate(
+        db=db, db_candidate=db_candidate, candidate_in=candidate_in
     )
-    return updated_candidate
+    relay.notify()
+    return _json_response(payload)
+
+# --- CONDITIONAL REQUESTS ---
+# A candidate's ETag changes with its version (bumped on every write, child
+# tables included) and updated_at; a page's ETag hashes the ETags of its rows.
+def _etag(row) -> str:
+    return f'"{row.version}-{int(row.updated_at.timestamp() * 1_000_000):x}"'
+
+def _page_etag(rows: list) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for row in rows:
+        digest.update(f"{row.id}{_etag(row)}".encode())
+    return f'"{digest.hexdigest()}"'
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+def _not_modified(etag: str, headers: dict | None = None) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, **(headers or {})})
+
+async def _conditional_read(request: Request, cached, get_version, get_document) -> Response:
+    # Cache hits answer from memory; with If-None-Match the version is checked
+    # by an indexed single-row lookup before the document is fetched.
+    if_none_match = request.headers.get("if-none-match")
+    if cached is not None:
+        payload, etag = cached
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+        return _json_response(payload, headers={"ETag": etag})
+
+    if if_none_match:
+        version = await get_version()
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Candidate not found"
+            )
+        if _etag_matches(if_none_match, _etag(version)):
+            return _not_modified(_etag(version))
+
+    token = candidate_cache.read_token()
+    document = await get_document()
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Candidate not found"
+        )
+    etag = _etag(document)
+    candidate_cache.store(document.document, etag, document.id, document.telegram_id, token)
+    return _json_response(document.document, headers={"ETag": etag})
+
+def _page_headers(rows: list, limit: int) -> dict:
+    headers = {"ETag": _page_etag(rows)}
+    if len(rows) == limit:
+        headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
+    return headers
+
+async def _conditional_page(request: Request, limit: int, get_versions, get_documents) -> Response:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        versions = await get_versions()
+        headers = _page_headers(versions, limit)
+        if _etag_matches(if_none_match, headers["ETag"]):
+            return _not_modified(headers.pop("ETag"), headers)
+
+    documents = await get_documents()
+    payload = b"[" + b",".join(d.document for d in documents) + b"]"
+    return _json_response(payload, headers=_page_headers(documents, limit))
 
 # --- CANDIDATE ---
 @router.post("/", response_model=schemas.Candidate, status_code=status.HTTP_201_CREATED)
-async def create_candidate(candidate: schemas.CandidateCreate, db: Session = Depends(get_db), pub: RabbitMQProducer = Depends(get_publisher)):
-    db_candidate = crud.candidate.get_candidate_by_telegram_id(
-        db, telegram_id=candidate.telegram_id
+async def create_candidate(candidate: schemas.CandidateCreate, db: AsyncSession = Depends(get_async_db), relay: OutboxRelay = Depends(get_outbox_relay)):
+    db_candidate = await crud_async.get_candidate_by_telegram_id(
+        db, telegram_id=candidate.telegram_id, profile=crud_async.LOAD_HEADER
     )
     if db_candidate:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Candidate with this Telegram ID already exists",
         )
-    db_candidate = crud.create_candidate(db=db, candidate=candidate)
+    db_candidate, payload = await crud_async.create_candidate(db=db, candidate_in=candidate)
+    relay.notify()
+
+    return _json_response(payload, status_code=status.HTTP_201_CREATED)
+
+@router.post("/bulk", response_model=schemas.BulkImportReport)
+async def bulk_import_candidates(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    relay: OutboxRelay = Depends(get_outbox_relay)
+):
+    report = schemas.BulkImportReport()
+    seen_telegram_ids = set()
+
+    async for chunk in _iter_bulk_chunks(request):
+        valid = []
+        for index, raw_item in chunk:
+            try:
+                if isinstance(raw_item, bytes):
+                    candidate = schemas.CandidateCreate.model_validate_json(raw_item)
+                else:
+                    candidate = schemas.CandidateCreate.model_validate(raw_item)
+            except ValidationError as e:
+                report.invalid += 1
+                report.items.append(schemas.BulkImportItemResult(
+                    index=index, status="invalid", error=str(e)
+                ))
+                continue
+            if candidate.telegram_id in seen_telegram_ids:
+                report.duplicates += 1
+                report.items.append(schemas.BulkImportItemResult(
+                    index=index, status="duplicate", telegram_id=candidate.telegram_id
+                ))
+                continue
+            seen_telegram_ids.add(candidate.telegram_id)
+            valid.append((index, candidate))
+
+        created = await crud_async.bulk_create_candidates(db, [candidate for _, candidate in valid])
+        if created:
+            relay.notify()
+        for index, candidate in valid:
+            candidate_id = created.get(candidate.telegram_id)
+            if candidate_id is None:
+                report.duplicates += 1
+                report.items.append(schemas.BulkImportItemResult(
+                    index=index, status="duplicate", telegram_id=candidate.telegram_id
+                ))
+            else:
+                report.created += 1
+                report.items.append(schemas.BulkImportItemResult(
+                    index=index, status="created", telegram_id=candidate.telegram_id, id=candidate_id
+                ))
+
+    report.items.sort(key=lambda item: item.index)
+    return report
+
+async def _get_documents(db: AsyncSession, ids: list[UUID], telegram_ids: list[int]):
+    documents = await crud_async.get_candidate_documents(db, ids)
+    documents += await crud_async.get_candidate_documents_by_telegram_ids(db, telegram_ids)
+    return documents
 
-    pydantic_candidate = schemas.Candidate.model_validate(db_candidate)
-    await pub.publish_message(
-        routing_key="candidate.created",
-        message_body=pydantic_candidate.model_dump_json().encode()
+@router.post("/batch-get", response_model=schemas.CandidateBatchGetResponse)
+async def batch_get_candidates(
+    batch: schemas.CandidateBatchGet,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    # Cache hits are served from memory, the rest with one IN query per key type.
+    # Items follow request order: ids first, then telegram_ids.
+    token = candidate_cache.read_token()
+    by_id = {}
+    by_telegram_id = {}
+    for candidate_id in batch.ids:
+        cached = candidate_cache.get_by_id(candidate_id)
+        if cached is not None:
+            by_id[candidate_id] = cached[0]
+    for telegram_id in batch.telegram_ids:
+        cached = candidate_cache.get_by_telegram_id(telegram_id)
+        if cached is not None:
+            by_telegram_id[telegram_id] = cached[0]
+
+    ids = [candidate_id for candidate_id in batch.ids if candidate_id not in by_id]
+    telegram_ids = [telegram_id for telegram_id in batch.telegram_ids if telegram_id not in by_telegram_id]
+    # Recently written keys are read from the primary, as single reads are, so a
+    # lagging replica never puts a stale document into the cache.
+    pinned_ids, pinned_telegram_ids = [], []
+    if read_router.async_replicas:
+        pinned_ids = [k for k in ids if read_router.is_pinned(k)]
+        pinned_telegram_ids = [k for k in telegram_ids if read_router.is_pinned(k)]
+    documents = await _get_documents(
+        db,
+        [k for k in ids if k not in pinned_ids],
+        [k for k in telegram_ids if k not in pinned_telegram_ids],
     )
+    if pinned_ids or pinned_telegram_ids:
+        async with AsyncSessionLocal() as primary:
+            documents += await _get_documents(primary, pinned_ids, pinned_telegram_ids)
+    for document in documents:
+        by_id[document.id] = by_telegram_id[document.telegram_id] = document.document
+        candidate_cache.store(document.document, _etag(document), document.id, document.telegram_id, token)
+
+    requested = [(b"id", orjson.dumps(str(k)), by_id.get(k)) for k in batch.ids]
+    requested += [(b"telegram_id", orjson.dumps(k), by_telegram_id.get(k)) for k in batch.telegram_ids]
+    items = []
+    for key_name, key, payload in requested:
+        if payload is None:
+            items.append(b'{"%s":%s,"found":false,"candidate":null}' % (key_name, key))
+        else:
+            items.append(b'{"%s":%s,"found":true,"candidate":%s}' % (key_name, key, payload))
+    return _json_response(b'{"items":[' + b",".join(items) + b"]}")
 
-    return db_candidate
+@router.post("/rank", response_model=schemas.CandidateRankResponse)
+async def rank_candidates(
+    query: schemas.CandidateRankRequest,
+    ranking: CandidateRanking = Depends(get_candidate_ranking),
+):
+    # Scored against the in-memory skill matrix; skill names resolve through the
+    # skill index, so no SQL runs here.
+    if not ranking.ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Ranking index is loading")
+    # Skills missing from the dictionary are held by no candidate; they are left
+    # out of the score instead of capping everyone below 1, and reported back.
+    required = []
+    unknown_skills = []
+    for skill in query.skills:
+        skill_id = skill_index.lookup(skill.skill)
+        if skill_id is None:
+            unknown_skills.append(skill.skill)
+        else:
+            required.append(RequiredSkill(skill_id, skill.weight, skill.min_level))
+    ranked = ranking.rank(
+        required,
+        float(query.min_experience) if query.min_experience is not None else None,
+        query.work_modes,
+        query.limit,
+    )
+    return ORJSONResponse({
+        "items": [
+            {"id": str(candidate_id), "telegram_id": telegram_id, "score": round(score, 4)}
+            for candidate_id, telegram_id, score in ranked
+        ],
+        "unknown_skills": unknown_skills,
+    })
 
 @router.get("/all", response_model=list[schemas.Candidate])
-def get_all_candidates(db: Session = Depends(get_db)):
-    return crud.candidate.get_all_candidates(db)
+async def get_all_candidates(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    after = _decode_cursor(cursor) if cursor else None
+    return await _conditional_page(
+        request, limit,
+        lambda: crud_async.get_candidate_versions_page(db, limit=limit, after=after),
+        lambda: crud_async.get_candidate_documents_page(db, limit=limit, after=after),
+    )
+
+@router.get("/search", response_model=list[schemas.Candidate])
+async def search_candidates(
+    request: Request,
+    filters: schemas.CandidateSearchFilters = Depends(_search_filters),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    after = _decode_cursor(cursor) if cursor else None
+    return await _conditional_page(
+        request, limit,
+        lambda: crud_async.search_candidate_versions(db, filters=filters, limit=limit, after=after),
+        lambda: crud_async.search_candidate_documents(db, filters=filters, limit=limit, after=after),
+    )
+
+@router.get("/all/stream")
+def stream_all_candidates():
+    def generate():
+        db = read_router.sync_session()
+        try:
+            for document in crud_candidate.iter_candidate_documents(db):
+                yield document.document + b"\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 @router.get("/{candidate_id}", response_model=schemas.Candidate)
-def read_candidate(candidate_id: UUID, db: Session = Depends(get_db)):
-    db_candidate = crud.candidate.get_candidate(db, candidate_id=candidate_id)
-    if db_candidate is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Candidate not found"
-        )
-    return db_candidate
+async def read_candidate(request: Request, candidate_id: UUID, db: AsyncSession = Depends(get_async_read_db)):
+    return await _conditional_read(
+        request,
+        candidate_cache.get_by_id(candidate_id),
+        lambda: crud_async.get_candidate_version(db, candidate_id=candidate_id),
+        lambda: crud_async.get_candidate_document(db, candidate_id=candidate_id),
+    )
 
 @router.patch("/{candidate_id}", response_model=schemas.Candidate)
 async def update_candidate(
     candidate_id: UUID,
     candidate_in: schemas.CandidateUpdate,
-    db: Session = Depends(get_db),
-    pub: RabbitMQProducer = Depends(get_publisher)
+    db: AsyncSession = Depends(get_async_db),
+    relay: OutboxRelay = Depends(get_outbox_relay)
 ):
-    db_candidate = crud.get_candidate(db, candidate_id=candidate_id)
+    db_candidate = await crud_async.get_candidate(
+        db, candidate_id=candidate_id, profile=_update_profile(candidate_in)
+    )
     if db_candidate is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Candidate not found"
         )
-    return await handle_update(db_candidate, candidate_in, db, pub)
+    return await handle_update(db_candidate, candidate_in, db, relay)
 
 @router.get("/by-telegram/{telegram_id}", response_model=schemas.Candidate)
-def read_candidate_by_telegram_id(
+async def read_candidate_by_telegram_id(
+    request: Request,
     telegram_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    db_candidate = crud.candidate.get_candidate_by_telegram_id(db, telegram_id=telegram_id)
-    if db_candidate is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Candidate not found"
-        )
-    return db_candidate
+    return await _conditional_read(
+        request,
+        candidate_cache.get_by_telegram_id(telegram_id),
+        lambda: crud_async.get_candidate_version_by_telegram_id(db, telegram_id=telegram_id),
+        lambda: crud_async.get_candidate_document_by_telegram_id(db, telegram_id=telegram_id),
+    )
 
 @router.patch("/by-telegram/{telegram_id}", response_model=schemas.Candidate)
 async def update_candidate_by_telegram_id(
     telegram_id: int,
     candidate_in: schemas.CandidateUpdate,
-    db: Session = Depends(get_db),
-    pub: RabbitMQProducer = Depends(get_publisher)
+    db: AsyncSession = Depends(get_async_db),
+    relay: OutboxRelay = Depends(get_outbox_relay)
 ):
-    db_candidate = crud.get_candidate_by_telegram_id(
-        db, telegram_id=telegram_id
+    db_candidate = await crud_async.get_candidate_by_telegram_id(
+        db, telegram_id=telegram_id, profile=_update_profile(candidate_in)
     )
     if db_candidate is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Candidate not found"
         )
-    return await handle_update(db_candidate, candidate_in, db, pub)
+    return await handle_update(db_candidate, candidate_in, db, relay)
 
 @router.delete("/{candidate_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_candidate(
         candidate_id: UUID,
-        db: Session = Depends(get_db),
-        pub: RabbitMQProducer = Depends(get_publisher)
+        db: AsyncSession = Depends(get_async_db),
+        relay: OutboxRelay = Depends(get_outbox_relay)
 ):
-    deleted_candidate = crud.delete_candidate(db, candidate_id=candidate_id)
+    deleted_candidate = await crud_async.delete_candidate(db, candidate_id=candidate_id)
     if not deleted_candidate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Candidate not found"
         )
 
-    message_body = json.dumps({"id": str(deleted_candidate.id)}).encode()
-    await pub.publish_message(
-        routing_key="candidate.deleted",
-        message_body=message_body
-    )
+    relay.notify()
 
     return None
 
+@router.post("/bulk-delete", response_model=schemas.BulkDeleteReport)
+async def bulk_delete_candidates(
+    batch: schemas.CandidateBulkDelete,
+    db: AsyncSession = Depends(get_async_db),
+    relay: OutboxRelay = Depends(get_outbox_relay)
+):
+    # GDPR purges: each chunk is its own transaction, so locks stay short and
+    # progress survives a failure halfway through.
+    report = schemas.BulkDeleteReport()
+    chunks = [
+        (batch.ids[start:start + BULK_DELETE_CHUNK_SIZE], [])
+        for start in range(0, len(batch.ids), BULK_DELETE_CHUNK_SIZE)
+    ] + [
+        ([], batch.telegram_ids[start:start + BULK_DELETE_CHUNK_SIZE])
+        for start in range(0, len(batch.telegram_ids), BULK_DELETE_CHUNK_SIZE)
+    ]
+    for candidate_ids, telegram_ids in chunks:
+        deleted = await crud_async.bulk_delete_candidates(db, candidate_ids, telegram_ids)
+        report.deleted += len(deleted)
+        report.deleted_ids.extend(row.id for row in deleted)
+        report.files_deleted += sum(
+            len(row.resume_file_ids or ()) + len(row.avatar_file_ids or ()) for row in deleted
+        )
+        if deleted:
+            relay.notify()
+    return report
+
 # --- RESUME ---
 @router.put("/by-telegram/{telegram_id}/resume", response_model=schemas.Resume)
-def replace_candidate_resume(
+async def replace_candidate_resume(
     telegram_id: int,
     resume_in: schemas.ResumeCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_candidate = crud.get_candidate_by_telegram_id(db, telegram_id=telegram_id)
-    if not db_candidate:
+    candidate_ref = await crud_async.get_candidate_version_by_telegram_id(db, telegram_id=telegram_id)
+    if not candidate_ref:
         raise HTTPException(status_code=404, detail="Candidate not found")
 
-    new_resume, old_file_id = crud.replace_resume(db=db, candidate=db_candidate, resume_in=resume_in)
+    new_resume, old_file_id = await crud_async.replace_resume(db=db, candidate_id=candidate_ref.id, resume_in=resume_in)
+    if new_resume is None:
+        raise HTTPException(status_code=409, detail="File is attached to another candidate")
 
     return new_resume
 
+@router.get("/by-telegram/{telegram_id}/resume/download-link", response_model=schemas.ResumeDownloadLink)
+async def get_candidate_resume_download_link(
+    telegram_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    files: FileServiceClient = Depends(get_file_service)
+):
+    file_id = await crud_async.get_resume_file_id(db, telegram_id=telegram_id)
+    if file_id is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return {"download_url": await _download_url(files, file_id)}
+
 @router.delete("/by-telegram/{telegram_id}/resume", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_candidate_resume(
     telegram_id: int,
-    db: Session = Depends(get_db),
-    pub: RabbitMQProducer = Depends(get_publisher)
+    db: AsyncSession = Depends(get_async_db),
+    relay: OutboxRelay = Depends(get_outbox_relay)
 ):
-    db_candidate = crud.get_candidate_by_telegram_id(db, telegram_id=telegram_id)
-    if not db_candidate:
+    candidate_ref = await crud_async.get_candidate_version_by_telegram_id(db, telegram_id=telegram_id)
+    if not candidate_ref:
         raise HTTPException(status_code=404, detail="Кандидат не найден")
-    db_resume = crud.delete_resume(db, candidate_id=db_candidate.id)
+    db_resume = await crud_async.delete_resume(db, candidate_id=candidate_ref.id)
     if not db_resume:
         raise HTTPException(status_code=404, detail="Резюме не найдено")
-    pydantic_candidate = schemas.Candidate.model_validate(db_candidate)
-    await pub.publish_message(
-        routing_key="candidate.updated",
-        message_body=pydantic_candidate.model_dump_json().encode()
-    )
+    relay.notify()
     return None
 
 # --- AVATAR ---
@@ -158,51 +531,44 @@ async def delete_candidate_resume(
 async def replace_candidate_avatar(
     telegram_id: int,
     avatar_in: schemas.AvatarCreate,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    pub: RabbitMQProducer = Depends(get_publisher)
+    db: AsyncSession = Depends(get_async_db),
+    relay: OutboxRelay = Depends(get_outbox_relay)
 ):
-    db_candidate = crud.get_candidate_by_telegram_id(db, telegram_id=telegram_id)
-    if not db_candidate:
+    candidate_ref = await crud_async.get_candidate_version_by_telegram_id(db, telegram_id=telegram_id)
+    if not candidate_ref:
         raise HTTPException(status_code=404, detail="Candidate not found")
 
-    new_avatar, old_file_id = crud.replace_avatar(db=db, candidate=db_candidate, avatar_in=avatar_in)
-
-    if old_file_id:
-        message_body = json.dumps({
-            "file_id": str(old_file_id),
-            "owner_telegram_id": telegram_id
-        }).encode()
-        background_tasks.add_task(
-            pub.publish_message,
-            routing_key="file.avatar.deleted",
-            message_body=message_body
-        )
-
-    updated_candidate = crud.get_candidate(db, candidate_id=db_candidate.id)
-    pydantic_candidate = schemas.Candidate.model_validate(updated_candidate)
-    await pub.publish_message(
-        routing_key="candidate.updated",
-        message_body=pydantic_candidate.model_dump_json().encode()
+    new_avatar, old_file_id = await crud_async.replace_avatar(
+        db=db, candidate_id=candidate_ref.id, telegram_id=candidate_ref.telegram_id, avatar_in=avatar_in
     )
+    if new_avatar is None:
+        raise HTTPException(status_code=409, detail="File is attached to another candidate")
+    relay.notify()
 
     return new_avatar
 
+@router.get("/by-telegram/{telegram_id}/avatar/download-link", response_model=schemas.AvatarDownloadLink)
+async def get_candidate_avatar_download_link(
+    telegram_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    files: FileServiceClient = Depends(get_file_service)
+):
+    file_id = await crud_async.get_avatar_file_id(db, telegram_id=telegram_id)
+    if file_id is None:
+        raise HTTPException(status_code=404, detail="Avatar not found")
+    return {"download_url": await _download_url(files, file_id)}
+
 @router.delete("/by-telegram/{telegram_id}/avatar", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_candidate_avatar(
     telegram_id: int,
-    db: Session = Depends(get_db),
-    pub: RabbitMQProducer = Depends(get_publisher)
+    db: AsyncSession = Depends(get_async_db),
+    relay: OutboxRelay = Depends(get_outbox_relay)
 ):
-    db_candidate = crud.get_candidate_by_telegram_id(db, telegram_id=telegram_id)
-    if not db_candidate:
+    candidate_ref = await crud_async.get_candidate_version_by_telegram_id(db, telegram_id=telegram_id)
+    if not candidate_ref:
         raise HTTPException(status_code=404, detail="Кандидат не найден")
-    db_avatar = crud.delete_avatar(db, candidate_id=db_candidate.id)
+    db_avatar = await crud_async.delete_avatar(db, candidate_id=candidate_ref.id)
     if not db_avatar:
         raise HTTPException(status_code=404, detail="Аватарка не найдена")
-    pydantic_candidate = schemas.Candidate.model_validate(db_candidate)
-    await pub.publish_message(
-        routing_key="candidate.updated",
-        message_body=pydantic_candidate.model_dump_json().encode()
-    )
+    relay.notify()
     return None
\ No newline at end of file
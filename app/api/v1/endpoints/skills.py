@@ -0,0 +1,23 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from app import schemas
+from app.services.skill_index import skill_index, SkillIndex
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# --- SUPPORT FUNCTION ---
+async def get_skill_index():
+    return skill_index
+
+# --- SKILLS ---
+@router.get("/autocomplete", response_model=List[schemas.SkillSuggestion])
+async def autocomplete_skills(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    index: SkillIndex = Depends(get_skill_index),
+):
+    # Served from memory; no database round trip.
+    if not index.ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Skill index is loading")
+    return ORJSONResponse(index.search(prefix, limit))
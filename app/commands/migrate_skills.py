@@ -0,0 +1,90 @@
+import argparse
+import time
+
+from sqlalchemy import text
+
+from app.core.db import SessionLocal
+from app.crud import candidate as crud_candidate, skill as crud_skill
+
+# Moves candidate_skills from free-form names to the skills dictionary: every
+# distinct normalized name becomes one skill (the most common spelling is kept
+# as its canonical name), rows get their skill_id, and the old column is dropped.
+# Run after app.commands.upgrade_schema and before the new code takes writes;
+# re-running is a no-op. Documents are rebuilt since names may change spelling.
+#
+#   python -m app.commands.migrate_skills
+#   python -m app.commands.migrate_skills --alias "js=JavaScript" --alias "golang=Go"
+
+# Must match services.skill_index.normalize_skill.
+_NORMALIZED = "lower(btrim(regexp_replace(skill, '\\s+', ' ', 'g')))"
+
+MIGRATION = [
+    "ALTER TABLE candidate_skills ADD COLUMN IF NOT EXISTS skill_id INTEGER REFERENCES skills (id)",
+    f"""
+    INSERT INTO skills (name, key)
+    SELECT DISTINCT ON (key) name, key
+    FROM (
+        SELECT btrim(regexp_replace(skill, '\\s+', ' ', 'g')) AS name, {_NORMALIZED} AS key, count(*) AS uses
+        FROM candidate_skills
+        WHERE skill_id IS NULL
+        GROUP BY 1, 2
+    ) spellings
+    WHERE NOT EXISTS (SELECT 1 FROM skill_aliases a WHERE a.key = spellings.key)
+    ORDER BY key, uses DESC, name
+    ON CONFLICT (key) DO NOTHING
+    """,
+    f"""
+    UPDATE candidate_skills cs
+    SET skill_id = coalesce(
+        (SELECT a.skill_id FROM skill_aliases a WHERE a.key = {_NORMALIZED}),
+        (SELECT s.id FROM skills s WHERE s.key = {_NORMALIZED})
+    )
+    WHERE cs.skill_id IS NULL
+    """,
+    "ALTER TABLE candidate_skills ALTER COLUMN skill_id SET NOT NULL",
+    "ALTER TABLE candidate_skills DROP COLUMN skill",
+    "CREATE INDEX IF NOT EXISTS ix_candidate_skills_skill_id_level ON candidate_skills (skill_id, level)",
+]
+
+
+def migrate(db):
+    has_name_column = db.execute(text(
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_name = 'candidate_skills' AND column_name = 'skill'"
+    )).first()
+    if not has_name_column:
+        return False
+    for statement in MIGRATION:
+        db.execute(text(statement))
+    db.commit()
+    return True
+
+
+def main(args):
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        # Aliases go first so that the backfill maps aliased spellings onto their skill.
+        for alias in args.alias:
+            name, _, skill_name = alias.partition("=")
+            if crud_skill.add_skill_alias(db, name, skill_name) is None:
+                print(f"Skipped alias {name!r}: it is already a skill of its own")
+
+        if migrate(db):
+            print("Migrated candidate_skills to skill ids, rebuilding documents")
+            after = None
+            while True:
+                after = crud_candidate.rebuild_documents(db, limit=500, after=after, only_missing=False)
+                if after is None:
+                    break
+        else:
+            print("candidate_skills already migrated")
+        print(f"Done in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize candidate skills into the skills dictionary")
+    parser.add_argument("--alias", action="append", default=[], help="alias=Canonical name, repeatable")
+    main(parser.parse_args())
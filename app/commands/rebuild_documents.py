@@ -0,0 +1,38 @@
+import argparse
+import time
+
+from app.core.db import SessionLocal
+from app.crud import candidate as crud_candidate
+
+# Backfills candidates.document for rows written before the column existed.
+# Run with --all after changing schemas.Candidate to re-render every row.
+# Apply app.commands.upgrade_schema first so the column exists.
+# API processes drop their cached candidates within CANDIDATE_CACHE_SYNC_INTERVAL.
+#
+#   python -m app.commands.rebuild_documents [--all] [--batch-size N]
+
+
+def main(args):
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        batches = 0
+        after = None
+        while True:
+            after = crud_candidate.rebuild_documents(
+                db, limit=args.batch_size, after=after, only_missing=not args.all
+            )
+            if after is None:
+                break
+            batches += 1
+            print(f"Rebuilt batch {batches} (up to {after[1]})")
+        print(f"Done: {batches} batches in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the denormalized candidate documents")
+    parser.add_argument("--all", action="store_true", help="rebuild every row, not only missing ones")
+    parser.add_argument("--batch-size", type=int, default=500)
+    main(parser.parse_args())
@@ -0,0 +1,34 @@
+import argparse
+import time
+
+from app.core.db import SessionLocal
+from app.crud import candidate as crud_candidate
+
+# Recomputes experience_years from the experiences table so open-ended jobs
+# keep counting. Meant for a daily cron / scheduled job; safe to re-run, only
+# candidates whose value changes get written and a candidate.updated event.
+# API processes drop their cached candidates within CANDIDATE_CACHE_SYNC_INTERVAL.
+#
+#   python -m app.commands.recompute_experience [--batch-size N]
+
+
+def main(args):
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        total = 0
+        after = None
+        while True:
+            changed, after = crud_candidate.recompute_experience_years(db, limit=args.batch_size, after=after)
+            if after is None:
+                break
+            total += changed
+        print(f"Recomputed experience_years: {total} candidates changed in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute experience_years for all candidates")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    main(parser.parse_args())
@@ -0,0 +1,63 @@
+from sqlalchemy import text
+
+from app.core.db import Base, engine
+from app.models import candidate as _candidate_models, outbox as _outbox_models  # noqa: F401 (register tables)
+
+# Creates missing tables and adds columns introduced after the first release.
+# Every statement is idempotent, so it is safe to run on each deploy.
+#
+#   python -m app.commands.upgrade_schema
+
+STATEMENTS = [
+    "ALTER TABLE candidates ADD COLUMN IF NOT EXISTS document JSON",
+    # Documents were jsonb, whose text form reorders keys and adds spaces. They
+    # are dropped rather than converted; reads serialize such rows from the
+    # tables until app.commands.rebuild_documents backfills them.
+    """
+    DO $$ BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'candidates' AND column_name = 'document' AND data_type = 'jsonb'
+        ) THEN
+            ALTER TABLE candidates ALTER COLUMN document TYPE JSON USING NULL;
+        END IF;
+    END $$
+    """,
+    "ALTER TABLE candidates ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE outbox_events ADD COLUMN IF NOT EXISTS candidate_id UUID",
+    "ALTER TABLE outbox_events ADD COLUMN IF NOT EXISTS available_at TIMESTAMP NOT NULL DEFAULT now()",
+    "CREATE INDEX IF NOT EXISTS ix_outbox_events_candidate_id ON outbox_events (candidate_id)",
+    "CREATE INDEX IF NOT EXISTS ix_candidates_created_at_id ON candidates (created_at, id)",
+    # Search filters: create_all only builds these for a new candidates table.
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_candidates_status_experience ON candidates (status, experience_years)",
+    "CREATE INDEX IF NOT EXISTS ix_candidates_work_modes ON candidates USING gin (work_modes)",
+    "CREATE INDEX IF NOT EXISTS ix_candidates_location_trgm ON candidates USING gin (location gin_trgm_ops)",
+    *(
+        f"""
+        DO $$ BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conname = '{table}_candidate_id_fkey' AND confdeltype <> 'c'
+            ) THEN
+                ALTER TABLE {table} DROP CONSTRAINT {table}_candidate_id_fkey,
+                    ADD CONSTRAINT {table}_candidate_id_fkey FOREIGN KEY (candidate_id)
+                    REFERENCES candidates (id) ON DELETE CASCADE;
+            END IF;
+        END $$
+        """
+        for table in ("candidate_skills", "resumes", "projects", "experiences", "avatars")
+    ),
+]
+
+
+def main():
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for statement in STATEMENTS:
+            conn.execute(text(statement))
+    print(f"Schema up to date ({len(STATEMENTS)} statements applied).")
+
+
+if __name__ == "__main__":
+    main()
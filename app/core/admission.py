@@ -0,0 +1,156 @@
+import asyncio
+import math
+import time
+from collections import deque
+
+import orjson
+
+from .config import (
+    ADMISSION_ENABLED, ADMISSION_CONCURRENCY, ADMISSION_QUEUE_LIMIT,
+    ADMISSION_QUEUE_BUDGET, ADMISSION_POOL_WAIT_LIMIT,
+)
+from .db import pool_pressure, PoolPressure
+from .metrics import ADMISSION_DECISIONS, ADMISSION_QUEUE_WAIT_SECONDS, ADMISSION_IN_FLIGHT, ADMISSION_QUEUED
+
+# --- ROUTE LANES ---
+# Lanes in priority order. Lower lanes get fewer slots, shorter queues and shed
+# earlier on pool pressure, so single-candidate reads keep their latency.
+LANES = ("interactive", "list", "bulk")
+
+ROUTE_LANES = {
+    "/v1/candidates/all": "list",
+    "/v1/candidates/all/stream": "list",
+    "/v1/candidates/search": "list",
+    "/v1/candidates/rank": "list",
+    "/v1/candidates/batch-get": "list",
+    "/v1/candidates/bulk": "bulk",
+    "/v1/candidates/bulk-delete": "bulk",
+}
+
+
+def route_lane(path: str) -> str | None:
+    # Probes, metrics and docs are never queued or shed.
+    if not path.startswith("/v1/"):
+        return None
+    return ROUTE_LANES.get(path.rstrip("/"), "interactive")
+
+
+class Shed(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+# --- LANE ---
+class Lane:
+    def __init__(self, name: str, concurrency: int, queue_limit: int, queue_budget: float, pool_wait_limit: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_limit = queue_limit
+        self.queue_budget = queue_budget
+        self.pool_wait_limit = pool_wait_limit
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        ADMISSION_IN_FLIGHT.labels(name).set_function(lambda: self.in_flight)
+        ADMISSION_QUEUED.labels(name).set_function(lambda: len(self._waiters))
+
+    def _decide(self, decision: str):
+        ADMISSION_DECISIONS.labels(self.name, decision).inc()
+
+    async def acquire(self, pressure: PoolPressure):
+        wait = pressure.checkout_wait()
+        if wait > self.pool_wait_limit:
+            self._decide("shed_pool_wait")
+            raise Shed("pool_wait", wait * 2)
+
+        if self.in_flight < self.concurrency and not self._waiters:
+            self.in_flight += 1
+            self._decide("admitted")
+            return
+
+        if len(self._waiters) >= self.queue_limit:
+            self._decide("shed_queue_full")
+            raise Shed("queue_full", self.queue_budget * len(self._waiters) / self.concurrency)
+
+        # A released slot is handed straight to the oldest waiter, so in_flight
+        # is not decremented and incremented around the handover.
+        started = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_budget)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if not waiter.done():
+            self._abandon(waiter)
+            self._decide("shed_queue_timeout")
+            raise Shed("queue_timeout", self.queue_budget)
+        ADMISSION_QUEUE_WAIT_SECONDS.labels(self.name).observe(time.perf_counter() - started)
+        self._decide("queued")
+
+    def _abandon(self, waiter: asyncio.Future):
+        if waiter.done():
+            # The slot arrived as the wait was given up; pass it on.
+            self.release()
+        else:
+            waiter.cancel()
+            self._waiters.remove(waiter)
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+# --- MIDDLEWARE ---
+class AdmissionMiddleware:
+    # Plain ASGI so the slot is held until a streamed body has been sent.
+    def __init__(self, app, pressure: PoolPressure = pool_pressure, enabled: bool = ADMISSION_ENABLED):
+        self.app = app
+        self.pressure = pressure
+        self.enabled = enabled
+        self.lanes = {
+            name: Lane(
+                name,
+                int(ADMISSION_CONCURRENCY[name]),
+                int(ADMISSION_QUEUE_LIMIT[name]),
+                ADMISSION_QUEUE_BUDGET[name],
+                ADMISSION_POOL_WAIT_LIMIT[name],
+            )
+            for name in LANES
+        }
+
+    async def __call__(self, scope, receive, send):
+        lane_name = route_lane(scope["path"]) if scope["type"] == "http" and self.enabled else None
+        if lane_name is None:
+            await self.app(scope, receive, send)
+            return
+
+        lane = self.lanes[lane_name]
+        try:
+            await lane.acquire(self.pressure)
+        except Shed as shed:
+            await self._reject(send, shed)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
+
+    @staticmethod
+    async def _reject(send, shed: Shed):
+        body = orjson.dumps({"detail": "Service is overloaded, retry later", "reason": shed.reason})
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(shed.retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -9,4 +9,83 @@ RABBITMQ_PORT=os.getenv("RABBITMQ_PORT")
 RABBITMQ_USER=os.getenv("RABBITMQ_USER")
 RABBITMQ_PASS=os.getenv("RABBITMQ_PASS")
 CANDIDATE_EXCHANGE_NAME=os.getenv("CANDIDATE_EXCHANGE_NAME")
-FILE_SERVICE_URL = os.getenv("FILE_SERVICE_URL")
\ No newline at end of file
+FILE_SERVICE_URL = os.getenv("FILE_SERVICE_URL")
+FILE_SERVICE_TIMEOUT = float(os.getenv("FILE_SERVICE_TIMEOUT", "5.0"))
+FILE_SERVICE_MAX_CONNECTIONS = int(os.getenv("FILE_SERVICE_MAX_CONNECTIONS", "20"))
+FILE_LINK_REFRESH_MARGIN = float(os.getenv("FILE_LINK_REFRESH_MARGIN", "30"))
+FILE_LINK_DEFAULT_TTL = float(os.getenv("FILE_LINK_DEFAULT_TTL", "300"))
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1.0"))
+OUTBOX_MAX_BACKOFF = float(os.getenv("OUTBOX_MAX_BACKOFF", "30.0"))
+# Events that failed this many times are parked: kept in the table but no longer retried.
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+
+# "snapshot" publishes the full candidate on candidate.updated, "delta" only the changed fields
+CANDIDATE_EVENT_MODE = os.getenv("CANDIDATE_EVENT_MODE", "snapshot")
+CANDIDATE_EVENT_COALESCE_SECONDS = float(os.getenv("CANDIDATE_EVENT_COALESCE_SECONDS", "0"))
+
+RABBITMQ_CHANNEL_POOL_SIZE = int(os.getenv("RABBITMQ_CHANNEL_POOL_SIZE", "4"))
+RABBITMQ_MAX_IN_FLIGHT = int(os.getenv("RABBITMQ_MAX_IN_FLIGHT", "256"))
+RABBITMQ_CONNECT_BACKOFF = float(os.getenv("RABBITMQ_CONNECT_BACKOFF", "1.0"))
+RABBITMQ_CONNECT_MAX_BACKOFF = float(os.getenv("RABBITMQ_CONNECT_MAX_BACKOFF", "30.0"))
+
+CANDIDATE_CACHE_SIZE = int(os.getenv("CANDIDATE_CACHE_SIZE", "10000"))
+CANDIDATE_CACHE_TTL = float(os.getenv("CANDIDATE_CACHE_TTL", "60"))
+# How often the cache checks for writes made by the maintenance commands.
+CANDIDATE_CACHE_SYNC_INTERVAL = float(os.getenv("CANDIDATE_CACHE_SYNC_INTERVAL", "5"))
+
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "1000"))
+BULK_DELETE_CHUNK_SIZE = int(os.getenv("BULK_DELETE_CHUNK_SIZE", "500"))
+
+DATABASE_REPLICA_URLS = [url for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url]
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+# Connections opened per async pool at startup, so the first requests skip the connect.
+DB_POOL_WARM_CONNECTIONS = int(os.getenv("DB_POOL_WARM_CONNECTIONS", os.getenv("DB_POOL_SIZE", "5")))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_REPLICA_POOL_SIZE = int(os.getenv("DB_REPLICA_POOL_SIZE", "5"))
+DB_REPLICA_MAX_OVERFLOW = int(os.getenv("DB_REPLICA_MAX_OVERFLOW", "10"))
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+SKILL_INDEX_REFRESH_INTERVAL = float(os.getenv("SKILL_INDEX_REFRESH_INTERVAL", "30"))
+# Skill ids below the highest one seen that every refresh reads again, for
+# inserts that committed after a later id had already been loaded.
+SKILL_INDEX_RESCAN_WINDOW = int(os.getenv("SKILL_INDEX_RESCAN_WINDOW", "1000"))
+# Full rebuild of the ranking matrix; in between it follows this process's own writes.
+CANDIDATE_RANKING_RELOAD_INTERVAL = float(os.getenv("CANDIDATE_RANKING_RELOAD_INTERVAL", "300"))
+
+# /readyz fails while the broker is down; events still queue up in the outbox.
+READINESS_REQUIRES_BROKER = os.getenv("READINESS_REQUIRES_BROKER", "true").lower() == "true"
+READINESS_DB_TIMEOUT = float(os.getenv("READINESS_DB_TIMEOUT", "2.0"))
+
+# Admission control. Routes fall into lanes: interactive (single-candidate reads
+# and writes), list (/all, /search, /rank, /batch-get) and bulk (/bulk,
+# /bulk-delete). Values are per lane, as "lane=value,..."; lanes left out keep
+# their default. Concurrency must be at least 1, the other values non-negative.
+def _parse_lanes(value: str) -> dict[str, float]:
+    return {
+        lane.strip(): float(value)
+        for lane, value in (item.split("=", 1) for item in value.split(",") if item.strip())
+    }
+
+def _per_lane(name: str, default: str, minimum: float = 0) -> dict[str, float]:
+    # Overrides are merged into the defaults, which also name the valid lanes.
+    values = _parse_lanes(default)
+    overrides = _parse_lanes(os.getenv(name, ""))
+    unknown = sorted(overrides.keys() - values.keys())
+    if unknown:
+        raise ValueError(f"{name}: unknown lane(s) {', '.join(unknown)}; expected {', '.join(values)}")
+    too_low = sorted(lane for lane, value in overrides.items() if value < minimum)
+    if too_low:
+        raise ValueError(f"{name}: value for {', '.join(too_low)} must be at least {minimum:g}")
+    values.update(overrides)
+    return values
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_CONCURRENCY = _per_lane("ADMISSION_CONCURRENCY", "interactive=64,list=8,bulk=2", minimum=1)
+ADMISSION_QUEUE_LIMIT = _per_lane("ADMISSION_QUEUE_LIMIT", "interactive=256,list=16,bulk=4")
+ADMISSION_QUEUE_BUDGET = _per_lane("ADMISSION_QUEUE_BUDGET", "interactive=0.5,list=0.25,bulk=0.1")
+# Shed once the recent pool checkout wait (seconds, decaying average) passes this.
+ADMISSION_POOL_WAIT_LIMIT = _per_lane("ADMISSION_POOL_WAIT_LIMIT", "interactive=0.5,list=0.1,bulk=0.05")
+ADMISSION_POOL_WAIT_DECAY = float(os.getenv("ADMISSION_POOL_WAIT_DECAY", "2.0"))
@@ -1,13 +1,107 @@
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import math
+import time
+from contextvars import ContextVar
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from .config import (
+    DATABASE_URL, ASYNC_DATABASE_URL, DATABASE_REPLICA_URLS,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_REPLICA_POOL_SIZE, DB_REPLICA_MAX_OVERFLOW,
+    DB_POOL_WARM_CONNECTIONS, READ_YOUR_WRITES_SECONDS, ADMISSION_POOL_WAIT_DECAY,
+)
+from .metrics import DB_POOL_CHECKOUT_SECONDS, DB_POOL_IN_USE, DB_POOL_IDLE, DB_READ_ROUTED
+
+
+# --- POOLS ---
+class PoolPressure:
+    # Moving average of checkout waits across all pools. It decays with time, so
+    # it falls back once shedding stops new checkouts from reporting.
+    def __init__(self, decay_seconds: float):
+        self.decay_seconds = decay_seconds
+        self._value = 0.0
+        self._updated = time.monotonic()
+
+    def _decayed(self, now: float) -> float:
+        return self._value * math.exp(-(now - self._updated) / self.decay_seconds)
+
+    def observe(self, wait: float):
+        now = time.monotonic()
+        self._value = 0.8 * self._decayed(now) + 0.2 * wait
+        self._updated = now
+
+    def checkout_wait(self) -> float:
+        return self._decayed(time.monotonic())
+
+
+pool_pressure = PoolPressure(ADMISSION_POOL_WAIT_DECAY)
+
+
+class _CheckoutTimingMixin:
+    metrics_label = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = time.perf_counter() - started
+            DB_POOL_CHECKOUT_SECONDS.labels(self.metrics_label).observe(wait)
+            pool_pressure.observe(wait)
+
 
-from .config import DATABASE_URL
+def _pool_class(base, label: str):
+    return type(f"Instrumented{base.__name__}", (_CheckoutTimingMixin, base), {"metrics_label": label})
 
-engine = create_engine(DATABASE_URL)
+
+def _async_url(url):
+    return make_url(url).set(drivername="postgresql+asyncpg")
+
+
+def _create_engines(label: str, url, async_url, pool_size: int, max_overflow: int):
+    sync_engine = create_engine(
+        url,
+        poolclass=_pool_class(QueuePool, f"{label}-sync"),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+    async_engine = create_async_engine(
+        async_url,
+        poolclass=_pool_class(AsyncAdaptedQueuePool, label),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+    for metrics_label, pooled_engine in ((f"{label}-sync", sync_engine), (label, async_engine)):
+        DB_POOL_IN_USE.labels(metrics_label).set_function(lambda e=pooled_engine: e.pool.checkedout())
+        DB_POOL_IDLE.labels(metrics_label).set_function(lambda e=pooled_engine: e.pool.checkedin())
+    return sync_engine, async_engine
+
+
+engine, async_engine = _create_engines(
+    "primary", DATABASE_URL, ASYNC_DATABASE_URL or _async_url(DATABASE_URL),
+    DB_POOL_SIZE, DB_MAX_OVERFLOW,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+replica_engines = [
+    _create_engines(
+        f"replica-{i}", url, _async_url(url), DB_REPLICA_POOL_SIZE, DB_REPLICA_MAX_OVERFLOW
+    )
+    for i, url in enumerate(DATABASE_REPLICA_URLS)
+]
+
 
 def get_db():
     db = SessionLocal()
@@ -15,3 +109,120 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# --- WARM-UP AND HEALTH ---
+async def warm_up_pools(connections: int = DB_POOL_WARM_CONNECTIONS):
+    # Connections are held concurrently so each pool ends up with that many idle ones.
+    async def _open(pooled_engine):
+        async with pooled_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    engines = [async_engine, *(replica_engine for _, replica_engine in replica_engines)]
+    await asyncio.gather(*(
+        _open(pooled_engine)
+        for pooled_engine in engines
+        for _ in range(min(connections, pooled_engine.pool.size()))
+    ))
+
+
+async def ping_database(timeout: float) -> bool:
+    async def _ping():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        await asyncio.wait_for(_ping(), timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+
+# --- READ ROUTING ---
+class ReadRouter:
+    def __init__(self, replicas: list, pin_seconds: float):
+        self.sync_replicas = [
+            sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+            for sync_engine, _ in replicas
+        ]
+        self.async_replicas = [
+            async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False)
+            for _, replica_engine in replicas
+        ]
+        self.pin_seconds = pin_seconds
+        self._pins: dict[str, float] = {}
+        self._next = itertools.count()
+
+    def pin(self, *keys):
+        # Reads for recently written keys go to the primary until replicas catch up.
+        now = time.monotonic()
+        if len(self._pins) > 10000:
+            self._pins = {key: expires for key, expires in self._pins.items() if expires > now}
+        for key in keys:
+            self._pins[str(key).lower()] = now + self.pin_seconds
+
+    def is_pinned(self, key) -> bool:
+        if key is None:
+            return False
+        expires = self._pins.get(str(key).lower())
+        return expires is not None and expires > time.monotonic()
+
+    def async_session(self, key: str | None = None):
+        if not self.async_replicas or self.is_pinned(key):
+            DB_READ_ROUTED.labels("primary").inc()
+            return AsyncSessionLocal()
+        DB_READ_ROUTED.labels("replica").inc()
+        return self.async_replicas[next(self._next) % len(self.async_replicas)]()
+
+    def sync_session(self):
+        if not self.sync_replicas:
+            DB_READ_ROUTED.labels("primary").inc()
+            return SessionLocal()
+        DB_READ_ROUTED.labels("replica").inc()
+        return self.sync_replicas[next(self._next) % len(self.sync_replicas)]()
+
+
+read_router = ReadRouter(replica_engines, READ_YOUR_WRITES_SECONDS)
+
+
+async def get_async_read_db(request: Request):
+    key = request.path_params.get("telegram_id") or request.path_params.get("candidate_id")
+    async with read_router.async_session(key) as db:
+        yield db
+
+
+# --- REQUEST STATS ---
+_request_stats: ContextVar[dict | None] = ContextVar("request_stats", default=None)
+
+
+def start_request_stats() -> dict:
+    stats = {"queries": 0, "db_seconds": 0.0, "profiles": []}
+    _request_stats.set(stats)
+    return stats
+
+
+def record_loader_profile(profile: str):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats["profiles"].append(profile)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats["queries"] += 1
+        conn.info["query_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _time_query(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    started = conn.info.pop("query_started", None)
+    if stats is not None and started is not None:
+        stats["db_seconds"] += time.perf_counter() - started
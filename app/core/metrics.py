@@ -0,0 +1,96 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# --- HTTP ---
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"]
+)
+
+# --- DATABASE ---
+DB_STATEMENTS_PER_REQUEST = Histogram(
+    "db_statements_per_request", "SQL statements executed per HTTP request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+DB_SECONDS_PER_REQUEST = Histogram(
+    "db_seconds_per_request", "Time spent executing SQL per HTTP request", ["route"]
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use", "Connections currently checked out of the pool", ["engine"]
+)
+DB_POOL_IDLE = Gauge(
+    "db_pool_connections_idle", "Idle connections held by the pool", ["engine"]
+)
+DB_READ_ROUTED = Counter(
+    "db_read_sessions_total", "Read-only sessions by target", ["target"]
+)
+
+# --- RABBITMQ ---
+RABBITMQ_CONFIRM_SECONDS = Histogram(
+    "rabbitmq_publish_confirm_seconds", "Time from publish to broker confirm"
+)
+RABBITMQ_PUBLISHED = Counter("rabbitmq_published_total", "Messages confirmed by the broker")
+RABBITMQ_NACKED = Counter("rabbitmq_nacked_total", "Messages rejected by the broker")
+RABBITMQ_FAILED = Counter("rabbitmq_publish_failed_total", "Publishes that failed before a confirm")
+
+# --- OUTBOX ---
+OUTBOX_EVENTS_COALESCED = Counter(
+    "outbox_events_coalesced_total", "Candidate events merged into a pending outbox event", ["routing_key"]
+)
+OUTBOX_EVENTS_PARKED = Counter(
+    "outbox_events_parked_total", "Outbox events that ran out of publish attempts", ["routing_key"]
+)
+
+# --- FILE SERVICE ---
+FILE_LINK_REQUESTS = Counter(
+    "file_download_link_requests_total", "Download link lookups by outcome", ["result"]
+)
+
+# --- SERIALIZATION ---
+SERIALIZATION_SECONDS = Histogram(
+    "candidate_serialization_seconds", "Time to validate and serialize one candidate",
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025),
+)
+
+# --- CACHE ---
+CANDIDATE_CACHE_REQUESTS = Counter(
+    "candidate_cache_requests_total", "Candidate cache lookups", ["result"]
+)
+CANDIDATE_CACHE_INVALIDATIONS = Counter(
+    "candidate_cache_invalidations_total", "Candidate cache invalidations"
+)
+
+# --- RANKING ---
+CANDIDATE_RANKING_SECONDS = Histogram(
+    "candidate_ranking_seconds", "Time to score and select the top candidates",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+CANDIDATE_RANKING_RELOAD_SECONDS = Histogram(
+    "candidate_ranking_reload_seconds", "Time to rebuild the ranking matrix from the database",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+# --- STARTUP ---
+APP_STARTUP_SECONDS = Gauge(
+    "app_startup_phase_seconds", "Time spent in each startup phase", ["phase"]
+)
+APP_FIRST_REQUEST_SECONDS = Gauge(
+    "app_cold_start_to_first_request_seconds", "Time from process start to the first served request"
+)
+
+# --- ADMISSION ---
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions_total", "Admission decisions by lane", ["lane", "decision"]
+)
+ADMISSION_QUEUE_WAIT_SECONDS = Histogram(
+    "admission_queue_wait_seconds", "Time admitted requests waited for a slot", ["lane"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight", "Requests holding an admission slot", ["lane"]
+)
+ADMISSION_QUEUED = Gauge(
+    "admission_queued", "Requests waiting for an admission slot", ["lane"]
+)
@@ -1,24 +1,71 @@
-from datetime import date
-
-from sqlalchemy.orm import Session
+import uuid
+from collections import defaultdict
+from collections.abc import Iterator
+from datetime import date, datetime
+from decimal import Decimal
+from typing import NamedTuple
+
+from sqlalchemy import Text, bindparam, cast, text, tuple_, event, exists, func, insert, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSON, UUID as PG_UUID, array, insert as pg_insert
+from sqlalchemy.orm import Session, selectinload, lazyload
 from uuid import UUID
+import orjson
 from app import models, schemas
+from app.core.config import CANDIDATE_EVENT_MODE, CANDIDATE_EVENT_COALESCE_SECONDS
+from app.core.db import record_loader_profile, read_router
+from app.core.metrics import OUTBOX_EVENTS_COALESCED
+from app.crud import outbox, skill as crud_skill
+from app.services.candidate_cache import candidate_cache
+from app.services.candidate_ranking import RankingEntry, candidate_ranking
+from app.services.skill_index import normalize_skill
+
+# --- LOADER PROFILES ---
+# full: whole profile for responses and events (one SELECT per relationship)
+# header: candidate row only, for existence checks and sub-resource writes
+# skills: candidate row plus skills, for matching and skill updates
+LOAD_FULL = "full"
+LOAD_HEADER = "header"
+LOAD_SKILLS = "skills"
+
+_LOADER_OPTIONS = {
+    LOAD_FULL: (
+        selectinload(models.Candidate.skills),
+        selectinload(models.Candidate.resumes),
+        selectinload(models.Candidate.projects),
+        selectinload(models.Candidate.experiences),
+        selectinload(models.Candidate.avatars),
+    ),
+    LOAD_HEADER: (lazyload("*"),),
+    LOAD_SKILLS: (selectinload(models.Candidate.skills), lazyload("*")),
+}
+
+def _candidate_query(db: Session, profile: str):
+    record_loader_profile(profile)
+    return db.query(models.Candidate).options(*_LOADER_OPTIONS[profile])
 
 # --- CANDIDATE ---
-def get_candidate_by_telegram_id(db: Session, telegram_id: int):
+def get_candidate_by_telegram_id(db: Session, telegram_id: int, profile: str = LOAD_FULL):
     return (
-        db.query(models.Candidate)
+        _candidate_query(db, profile)
         .filter(models.Candidate.telegram_id == telegram_id)
         .first()
     )
 
-def get_candidate(db: Session, candidate_id: UUID):
+def get_candidate(db: Session, candidate_id: UUID, profile: str = LOAD_FULL):
     return (
-        db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
+        _candidate_query(db, profile).filter(models.Candidate.id == candidate_id).first()
+    )
+
+def reload_candidate(db: Session, candidate_id: UUID):
+    return (
+        _candidate_query(db, LOAD_FULL)
+        .populate_existing()
+        .filter(models.Candidate.id == candidate_id)
+        .first()
     )
 
 def get_all_candidates(db: Session):
-    return db.query(models.Candidate).all()
+    return _candidate_query(db, LOAD_FULL).all()
 
 def create_candidate(db: Session, candidate: schemas.CandidateCreate):
     skills_data = candidate.skills
@@ -27,9 +74,10 @@ def create_candidate(db: Session, candidate: schemas.CandidateCreate):
 
     db_candidate = models.Candidate(**candidate_data)
 
+    skill_ids = crud_skill.resolve_skill_ids(db, [skill_in.skill for skill_in in skills_data])
     for skill_in in skills_data:
         db_skill = models.CandidateSkill(
-            **skill_in.model_dump(), candidate=db_candidate
+            **_skill_row(skill_in.model_dump(), skill_ids), candidate=db_candidate
         )
         db.add(db_skill)
 
@@ -40,68 +88,371 @@ def create_candidate(db: Session, candidate: schemas.CandidateCreate):
         db.add(db_project)
 
     db.add(db_candidate)
+    db.flush()
+    snapshot, payload = _enqueue_snapshot(db, "candidate.created", db_candidate.id)
+    db.commit()
+    return snapshot, payload
+
+def bulk_create_candidates(
+    db: Session, candidates: list[schemas.CandidateCreate]
+) -> dict[int, UUID]:
+    if not candidates:
+        return {}
+
+    candidate_rows = []
+    skill_rows = []
+    project_rows = []
+    for candidate_in in candidates:
+        candidate_id = uuid.uuid4()
+        candidate_rows.append(
+            {"id": candidate_id, **candidate_in.model_dump(exclude={"skills", "projects"})}
+        )
+        skill_rows.extend(
+            {"candidate_id": candidate_id, **skill_in.model_dump()} for skill_in in candidate_in.skills
+        )
+        project_rows.extend(
+            {"candidate_id": candidate_id, **project_in.model_dump()} for project_in in candidate_in.projects
+        )
+
+    inserted = db.execute(
+        pg_insert(models.Candidate)
+        .on_conflict_do_nothing(index_elements=[models.Candidate.telegram_id])
+        .returning(models.Candidate.id, models.Candidate.telegram_id),
+        candidate_rows,
+    ).all()
+    created = {telegram_id: candidate_id for candidate_id, telegram_id in inserted}
+    db.info.setdefault("dirty_candidates", set()).update(tuple(row) for row in inserted)
+    created_ids = set(created.values())
+
+    skill_rows = [row for row in skill_rows if row["candidate_id"] in created_ids]
+    project_rows = [row for row in project_rows if row["candidate_id"] in created_ids]
+    if skill_rows:
+        skill_ids = crud_skill.resolve_skill_ids(db, [row["skill"] for row in skill_rows])
+        skill_rows = [
+            {"candidate_id": row["candidate_id"], **_skill_row(row, skill_ids)} for row in skill_rows
+        ]
+        db.execute(insert(models.CandidateSkill), skill_rows)
+    if project_rows:
+        db.execute(insert(models.Project), project_rows)
+
+    if created_ids:
+        snapshots = (
+            _candidate_query(db, LOAD_FULL)
+            .filter(models.Candidate.id.in_(created_ids))
+            .all()
+        )
+        documents = [(snapshot.id, schemas.serialize_candidate(snapshot)) for snapshot in snapshots]
+        for snapshot in snapshots:
+            _track_ranking(db, snapshot)
+        _store_documents(db, documents)
+        outbox.add_events(db, [
+            ("candidate.created", payload, candidate_id) for candidate_id, payload in documents
+        ])
+
     db.commit()
-    db.refresh(db_candidate)
-    return db_candidate
+    return created
 
 def update_candidate(
     db: Session, db_candidate: models.Candidate, candidate_in: schemas.CandidateUpdate
 ):
     update_data = candidate_in.model_dump(exclude_unset=True)
+    changed = False
 
     for field, value in update_data.items():
-        if field not in ["skills", "projects", "experiences"]:
+        if field not in ["skills", "projects", "experiences"] and getattr(db_candidate, field) != value:
             setattr(db_candidate, field, value)
+            changed = True
 
     if "skills" in update_data and update_data["skills"] is not None:
-        db.query(models.CandidateSkill).filter(
-            models.CandidateSkill.candidate_id == db_candidate.id
-        ).delete(synchronize_session=False)
-
-        for skill_in in candidate_in.skills:
-            db_skill = models.CandidateSkill(
-                **skill_in.model_dump(), candidate_id=db_candidate.id
-            )
-            db.add(db_skill)
+        skill_ids = crud_skill.resolve_skill_ids(db, [skill_in.skill for skill_in in candidate_in.skills])
+        changed |= _sync_children(
+            db, db_candidate.skills, [_skill_row(skill_in.model_dump(), skill_ids) for skill_in in candidate_in.skills],
+            models.CandidateSkill, db_candidate.id, key=("skill_id",),
+        )
 
     if "projects" in update_data and update_data["projects"] is not None:
-        db.query(models.Project).filter(
-            models.Project.candidate_id == db_candidate.id
-        ).delete(synchronize_session=False)
-
-        for project_in in candidate_in.projects:
-            db_project = models.Project(
-                **project_in.model_dump(), candidate_id=db_candidate.id
-            )
-            db.add(db_project)
+        changed |= _sync_children(
+            db, db_candidate.projects, [project_in.model_dump() for project_in in candidate_in.projects],
+            models.Project, db_candidate.id, key=("title",),
+        )
 
     if "experiences" in update_data and update_data["experiences"] is not None:
-        db.query(models.Experience).filter(
-            models.Experience.candidate_id == db_candidate.id
-        ).delete(synchronize_session=False)
-
-        new_experiences_models = []
-        for exp_in in candidate_in.experiences:
-            db_exp = models.Experience(
-                **exp_in.model_dump(), candidate_id=db_candidate.id
-            )
-            db.add(db_exp)
-            new_experiences_models.append(db_exp)
+        changed |= _sync_children(
+            db, db_candidate.experiences, [exp_in.model_dump() for exp_in in candidate_in.experiences],
+            models.Experience, db_candidate.id, key=("company", "position", "start_date"),
+        )
+
+        total_exp_years = Decimal(str(_calculate_total_experience(candidate_in.experiences)))
+        if db_candidate.experience_years != total_exp_years:
+            setattr(db_candidate, 'experience_years', total_exp_years)
+            changed = True
 
-        total_exp_years = _calculate_total_experience(new_experiences_models)
-        setattr(db_candidate, 'experience_years', total_exp_years)
+    if not changed:
+        # Nothing to write: answer with the stored document, no child reloads.
+        return db_candidate, get_candidate_document(db, db_candidate.id).document
 
     db.add(db_candidate)
+    snapshot, payload = _enqueue_snapshot(db, "candidate.updated", db_candidate.id)
     db.commit()
-    db.refresh(db_candidate)
-    return db_candidate
+    return snapshot, payload
+
+def _sync_children(
+    db: Session, existing: list, incoming: list[dict], model, candidate_id: UUID, key: tuple[str, ...]
+) -> bool:
+    # Rows are matched on a natural key: matched rows are updated in place only
+    # when a field differs, unmatched input is inserted, leftovers are deleted.
+    existing_by_key = defaultdict(list)
+    for row in existing:
+        existing_by_key[tuple(getattr(row, field) for field in key)].append(row)
+
+    changed = False
+    for data in incoming:
+        matches = existing_by_key.get(tuple(data[field] for field in key))
+        if matches:
+            row = matches.pop(0)
+            for field, value in data.items():
+                if getattr(row, field) != value:
+                    setattr(row, field, value)
+                    changed = True
+        else:
+            db.add(model(**data, candidate_id=candidate_id))
+            changed = True
+
+    for rows in existing_by_key.values():
+        for row in rows:
+            db.delete(row)
+            changed = True
+    return changed
+
+def _skill_row(data: dict, skill_ids: dict[str, int]) -> dict:
+    return {"skill_id": skill_ids[data["skill"]], "kind": data["kind"], "level": data["level"]}
+
+def delete_candidate(db: Session, candidate_id: UUID):
+    deleted = _delete_candidates(db, models.Candidate.id == candidate_id)
+    db.commit()
+    return deleted[0] if deleted else None
+
+def bulk_delete_candidates(db: Session, candidate_ids: list[UUID], telegram_ids: list[int]) -> list:
+    if not candidate_ids and not telegram_ids:
+        return []
+    deleted = _delete_candidates(db, or_(
+        models.Candidate.id.in_(candidate_ids),
+        models.Candidate.telegram_id.in_(telegram_ids),
+    ))
+    db.commit()
+    return deleted
+
+def _delete_candidates(db: Session, condition) -> list:
+    # Child rows go through ON DELETE CASCADE; the file ids are collected by
+    # RETURNING subqueries, which still see the children (statement snapshot).
+    candidates = models.Candidate.__table__
+    deleted = db.execute(
+        delete(candidates)
+        .where(condition)
+        .returning(
+            candidates.c.id,
+            candidates.c.telegram_id,
+            _file_ids(models.Resume).label("resume_file_ids"),
+            _file_ids(models.Avatar).label("avatar_file_ids"),
+        )
+    ).all()
+    if not deleted:
+        return []
+
+    if CANDIDATE_EVENT_COALESCE_SECONDS:
+        outbox.discard_pending_events(db, "candidate.updated", [row.id for row in deleted])
+    events = []
+    for row in deleted:
+        events.append(("candidate.deleted", orjson.dumps({"id": str(row.id)}), row.id))
+        for routing_key, file_ids in (
+            ("file.resume.deleted", row.resume_file_ids),
+            ("file.avatar.deleted", row.avatar_file_ids),
+        ):
+            events.extend(
+                (routing_key, orjson.dumps({"file_id": str(file_id), "owner_telegram_id": row.telegram_id}), row.id)
+                for file_id in file_ids or ()
+            )
+    outbox.add_events(db, events)
+    db.info.setdefault("dirty_candidates", set()).update((row.id, row.telegram_id) for row in deleted)
+    db.info.setdefault("ranking_updates", []).extend(("delete", row.id) for row in deleted)
+    return deleted
 
-def delete_candidate(db: Session, candidate_id: UUID) -> models.Candidate | None:
-    db_candidate = db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
-    if db_candidate:
-        db.delete(db_candidate)
-        db.commit()
-    return db_candidate
+def _file_ids(model):
+    return (
+        select(func.array_agg(model.file_id))
+        .where(model.candidate_id == models.Candidate.__table__.c.id)
+        .scalar_subquery()
+    )
+
+# --- DOCUMENTS ---
+# Reads that only need the response body fetch the denormalized candidates.document
+# as text, so no child table is touched and no JSON is decoded on the way out.
+class CandidateDocument(NamedTuple):
+    id: UUID
+    telegram_id: int
+    created_at: datetime
+    version: int
+    updated_at: datetime
+    document: bytes
+
+class CandidateVersion(NamedTuple):
+    id: UUID
+    telegram_id: int
+    created_at: datetime
+    version: int
+    updated_at: datetime
+
+def _version_select(profile: str = "version"):
+    record_loader_profile(profile)
+    return select(
+        models.Candidate.id,
+        models.Candidate.telegram_id,
+        models.Candidate.created_at,
+        models.Candidate.version,
+        models.Candidate.updated_at,
+    )
+
+def _document_select():
+    return _version_select("document").add_columns(cast(models.Candidate.document, Text))
+
+def _to_documents(db: Session, rows) -> list[CandidateDocument]:
+    # Rows written before the column existed are serialized from the ORM until backfilled.
+    missing = [row.id for row in rows if row.document is None]
+    snapshots = {}
+    if missing:
+        snapshots = {
+            snapshot.id: snapshot
+            for snapshot in _candidate_query(db, LOAD_FULL).filter(models.Candidate.id.in_(missing))
+        }
+    return [
+        CandidateDocument(
+            *row[:5],
+            row.document.encode() if row.document is not None else schemas.serialize_candidate(snapshots[row.id]),
+        )
+        for row in rows
+        if row.document is not None or row.id in snapshots
+    ]
+
+def _first_document(db: Session, query) -> CandidateDocument | None:
+    documents = _to_documents(db, db.execute(query).all())
+    return documents[0] if documents else None
+
+def get_candidate_document(db: Session, candidate_id: UUID) -> CandidateDocument | None:
+    return _first_document(db, _document_select().where(models.Candidate.id == candidate_id))
+
+def get_candidate_document_by_telegram_id(db: Session, telegram_id: int) -> CandidateDocument | None:
+    return _first_document(db, _document_select().where(models.Candidate.telegram_id == telegram_id))
+
+def get_candidate_documents(db: Session, candidate_ids: list[UUID]) -> list[CandidateDocument]:
+    if not candidate_ids:
+        return []
+    query = _document_select().where(models.Candidate.id.in_(set(candidate_ids)))
+    return _to_documents(db, db.execute(query).all())
+
+def get_candidate_documents_by_telegram_ids(db: Session, telegram_ids: list[int]) -> list[CandidateDocument]:
+    if not telegram_ids:
+        return []
+    query = _document_select().where(models.Candidate.telegram_id.in_(set(telegram_ids)))
+    return _to_documents(db, db.execute(query).all())
+
+def get_candidate_version(db: Session, candidate_id: UUID) -> CandidateVersion | None:
+    row = db.execute(_version_select().where(models.Candidate.id == candidate_id)).first()
+    return CandidateVersion(*row) if row else None
+
+def get_candidate_version_by_telegram_id(db: Session, telegram_id: int) -> CandidateVersion | None:
+    row = db.execute(_version_select().where(models.Candidate.telegram_id == telegram_id)).first()
+    return CandidateVersion(*row) if row else None
+
+def _keyset(query, limit: int, after: tuple[datetime, UUID] | None):
+    query = query.order_by(models.Candidate.created_at, models.Candidate.id)
+    if after is not None:
+        query = query.where(
+            tuple_(models.Candidate.created_at, models.Candidate.id) > after
+        )
+    return query.limit(limit)
+
+def get_candidate_documents_page(
+    db: Session, limit: int, after: tuple[datetime, UUID] | None = None
+) -> list[CandidateDocument]:
+    return _to_documents(db, db.execute(_keyset(_document_select(), limit, after)).all())
+
+def get_candidate_versions_page(
+    db: Session, limit: int, after: tuple[datetime, UUID] | None = None
+) -> list[CandidateVersion]:
+    return [CandidateVersion(*row) for row in db.execute(_keyset(_version_select(), limit, after))]
+
+def _escape_like(value: str) -> str:
+    # The location filter is a literal substring, so LIKE wildcards are escaped.
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _search_conditions(filters: schemas.CandidateSearchFilters) -> list:
+    conditions = []
+    for skill_name in filters.skills:
+        skill_match = [
+            models.CandidateSkill.candidate_id == models.Candidate.id,
+            models.CandidateSkill.skill_id.in_(crud_skill.skill_ids_for_key(normalize_skill(skill_name))),
+        ]
+        if filters.skill_kind is not None:
+            skill_match.append(models.CandidateSkill.kind == filters.skill_kind)
+        if filters.min_skill_level is not None:
+            skill_match.append(models.CandidateSkill.level >= filters.min_skill_level)
+        conditions.append(exists().where(*skill_match))
+
+    if filters.location:
+        conditions.append(models.Candidate.location.ilike(f"%{_escape_like(filters.location)}%", escape="\\"))
+    if filters.min_experience is not None:
+        conditions.append(models.Candidate.experience_years >= filters.min_experience)
+    if filters.max_experience is not None:
+        conditions.append(models.Candidate.experience_years <= filters.max_experience)
+    if filters.work_modes:
+        conditions.append(models.Candidate.work_modes.has_any(array(filters.work_modes)))
+    if filters.status is not None:
+        conditions.append(models.Candidate.status == filters.status)
+    return conditions
+
+def search_candidate_documents(
+    db: Session,
+    filters: schemas.CandidateSearchFilters,
+    limit: int,
+    after: tuple[datetime, UUID] | None = None,
+) -> list[CandidateDocument]:
+    query = _document_select().where(*_search_conditions(filters))
+    return _to_documents(db, db.execute(_keyset(query, limit, after)).all())
+
+def search_candidate_versions(
+    db: Session,
+    filters: schemas.CandidateSearchFilters,
+    limit: int,
+    after: tuple[datetime, UUID] | None = None,
+) -> list[CandidateVersion]:
+    query = _version_select().where(*_search_conditions(filters))
+    return [CandidateVersion(*row) for row in db.execute(_keyset(query, limit, after))]
+
+def iter_candidate_documents(db: Session, chunk_size: int = 500) -> Iterator[CandidateDocument]:
+    result = db.execute(
+        _document_select()
+        .order_by(models.Candidate.created_at, models.Candidate.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for rows in result.partitions():
+        yield from _to_documents(db, rows)
+
+def rebuild_documents(
+    db: Session, limit: int, after: tuple[datetime, UUID] | None = None, only_missing: bool = True
+) -> tuple[datetime, UUID] | None:
+    # One keyset batch per call; returns the key to resume after, or None when done.
+    query = _candidate_query(db, LOAD_FULL).order_by(models.Candidate.created_at, models.Candidate.id)
+    if only_missing:
+        query = query.filter(models.Candidate.document.is_(None))
+    if after is not None:
+        query = query.filter(tuple_(models.Candidate.created_at, models.Candidate.id) > after)
+    snapshots = query.limit(limit).all()
+    if not snapshots:
+        return None
+    _store_documents(db, [(snapshot.id, schemas.serialize_candidate(snapshot)) for snapshot in snapshots])
+    db.commit()
+    bump_cache_generation(db)
+    return snapshots[-1].created_at, snapshots[-1].id
 
 # --- RESUME ---
 def add_resume(db: Session, candidate: models.Candidate, resume_in: schemas.ResumeCreate) -> models.Resume:
@@ -112,75 +463,373 @@ def add_resume(db: Session, candidate: models.Candidate, resume_in: schemas.Resu
     db.refresh(db_resume)
     return db_resume
 
-def replace_resume(db: Session, candidate: models.Candidate, resume_in: schemas.ResumeCreate) -> (models.Resume, UUID | None):
-    old_file_id = None
-    if candidate.resumes:
-        old_resume_record = candidate.resumes[0]
-        old_file_id = old_resume_record.file_id
-        db.delete(old_resume_record)
-        db.flush()
+def get_resume_file_id(db: Session, telegram_id: int) -> UUID | None:
+    return _file_id_by_telegram_id(db, models.Resume, telegram_id)
 
-    new_resume_record = models.Resume(candidate_id=candidate.id, file_id=resume_in.file_id)
-    db.add(new_resume_record)
+def replace_resume(db: Session, candidate_id: UUID, resume_in: schemas.ResumeCreate):
+    resume, old_file_id, replaced = _swap_file(db, models.Resume, candidate_id, resume_in.file_id)
+    if not replaced:
+        return resume, None
+    _patch_document(db, candidate_id, "resumes", lambda resumes: [schemas.Resume.model_validate(resume)])
     db.commit()
-    db.refresh(new_resume_record)
+    return resume, old_file_id
 
-    return new_resume_record, old_file_id
-
-def delete_resume(db: Session, candidate_id: UUID) -> models.Resume | None:
-    db_resume = db.query(models.Resume).filter(models.Resume.candidate_id == candidate_id).first()
-    if db_resume:
-        db.delete(db_resume)
+def delete_resume(db: Session, candidate_id: UUID):
+    resume = _delete_file(db, models.Resume, candidate_id)
+    if resume is not None:
+        _patch_document(db, candidate_id, "resumes", lambda resumes: [], routing_key="candidate.updated")
         db.commit()
-    return db_resume
+    return resume
 
 # --- PROJECT ---
-def add_project(db: Session, candidate: models.Candidate, project_in: schemas.ProjectCreate) -> models.Project:
-    db_project = models.Project(**project_in.model_dump(), candidate_id=candidate.id)
-    db.add(db_project)
+def add_project(db: Session, candidate_id: UUID, project_in: schemas.ProjectCreate):
+    projects = models.Project.__table__
+    project = db.execute(
+        insert(projects)
+        .values(id=uuid.uuid4(), candidate_id=candidate_id, **project_in.model_dump())
+        .returning(*projects.c)
+    ).one()
+    _patch_document(
+        db, candidate_id, "projects", lambda projects: [*projects, schemas.Project.model_validate(project)]
+    )
     db.commit()
-    db.refresh(db_project)
-    return db_project
-
-def delete_project(db: Session, project_id: UUID) -> models.Project | None:
-    db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if db_project:
-        db.delete(db_project)
+    return project
+
+def delete_project(db: Session, project_id: UUID):
+    projects = models.Project.__table__
+    project = db.execute(
+        delete(projects).where(projects.c.id == project_id).returning(*projects.c)
+    ).first()
+    if project is not None:
+        _patch_document(
+            db, project.candidate_id, "projects",
+            lambda projects: [item for item in projects if item.id != project_id],
+        )
         db.commit()
-    return db_project
+    return project
 
 # --- AVATAR ---
-def replace_avatar(db: Session, candidate: models.Candidate, avatar_in: schemas.AvatarCreate) -> (models.Avatar, UUID | None):
-    old_file_id = None
-    if candidate.avatars:
-        old_avatar_record = candidate.avatars[0]
-        old_file_id = old_avatar_record.file_id
-        db.delete(old_avatar_record)
-        db.flush()
-
-    new_avatar_record = models.Avatar(candidate_id=candidate.id, file_id=avatar_in.file_id)
-    db.add(new_avatar_record)
+def get_avatar_file_id(db: Session, telegram_id: int) -> UUID | None:
+    return _file_id_by_telegram_id(db, models.Avatar, telegram_id)
+
+def replace_avatar(db: Session, candidate_id: UUID, telegram_id: int, avatar_in: schemas.AvatarCreate):
+    avatar, old_file_id, replaced = _swap_file(db, models.Avatar, candidate_id, avatar_in.file_id)
+    if not replaced:
+        return avatar, None
+    if old_file_id:
+        outbox.add_event(db, "file.avatar.deleted", orjson.dumps({
+            "file_id": str(old_file_id),
+            "owner_telegram_id": telegram_id
+        }))
+    _patch_document(
+        db, candidate_id, "avatars", lambda avatars: [schemas.Avatar.model_validate(avatar)],
+        routing_key="candidate.updated",
+    )
     db.commit()
-    db.refresh(new_avatar_record)
-
-    return new_avatar_record, old_file_id
+    return avatar, old_file_id
 
-def delete_avatar(db:Session, candidate_id: UUID) -> models.Avatar | None:
-    db_avatar = db.query(models.Avatar).filter(models.Avatar.candidate_id == candidate_id).first()
-    if db_avatar:
-        db.delete(db_avatar)
+def delete_avatar(db: Session, candidate_id: UUID):
+    avatar = _delete_file(db, models.Avatar, candidate_id)
+    if avatar is not None:
+        _patch_document(db, candidate_id, "avatars", lambda avatars: [], routing_key="candidate.updated")
         db.commit()
-    return db_avatar
+    return avatar
+
+# --- SINGLE-FILE CHILDREN ---
+# Resume and avatar are one row per candidate. A swap is a single statement:
+# lock the candidate row, DELETE ... RETURNING the old file, INSERT the new one.
+# Re-sending the current file keeps its row and changes nothing else; a file
+# owned by another candidate returns no row, and the delete is rolled back.
+# Returns (row, old_file_id, replaced).
+def _swap_file(db: Session, model, candidate_id: UUID, file_id: UUID):
+    table = model.__table__
+    candidates = models.Candidate.__table__
+    locked = (
+        select(candidates.c.id).where(candidates.c.id == candidate_id).with_for_update().cte("locked")
+    )
+    old = (
+        delete(table)
+        .where(
+            table.c.candidate_id == select(locked.c.id).scalar_subquery(),
+            table.c.file_id != file_id,
+        )
+        .returning(table.c.file_id)
+        .cte("old")
+    )
+    row_id = uuid.uuid4()
+    stmt = pg_insert(table).values(id=row_id, candidate_id=candidate_id, file_id=file_id)
+    row = db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.file_id],
+            set_={"file_id": stmt.excluded.file_id},
+            where=table.c.candidate_id == stmt.excluded.candidate_id,
+        )
+        .returning(*table.c, select(old.c.file_id).limit(1).scalar_subquery().label("old_file_id"))
+        .add_cte(locked)
+        .add_cte(old)
+    ).first()
+    if row is None:
+        db.rollback()
+        return None, None, False
+    if row.id != row_id and row.old_file_id is None:
+        # The conflict hit this candidate's own row: the file is already attached.
+        db.commit()
+        return row, None, False
+    return row, row.old_file_id, True
+
+def _file_id_by_telegram_id(db: Session, model, telegram_id: int) -> UUID | None:
+    return db.execute(
+        select(model.file_id)
+        .join(models.Candidate, models.Candidate.id == model.candidate_id)
+        .where(models.Candidate.telegram_id == telegram_id)
+        .limit(1)
+    ).scalar()
+
+def _delete_file(db: Session, model, candidate_id: UUID):
+    table = model.__table__
+    return db.execute(
+        delete(table).where(table.c.candidate_id == candidate_id).returning(*table.c)
+    ).first()
+
+# --- EVENTS ---
+def _refresh_document(db: Session, candidate_id: UUID) -> tuple[models.Candidate, bytes]:
+    # The serialized snapshot is returned so callers can reuse it as the response body.
+    db.flush()
+    snapshot = reload_candidate(db, candidate_id=candidate_id)
+    payload = schemas.serialize_candidate(snapshot)
+    _store_documents(db, [(candidate_id, payload)])
+    _mark_dirty(db, snapshot)
+    _track_ranking(db, snapshot)
+    return snapshot, payload
+
+def _enqueue_snapshot(db: Session, routing_key: str, candidate_id: UUID) -> tuple[models.Candidate, bytes]:
+    delta = routing_key == "candidate.updated" and CANDIDATE_EVENT_MODE == "delta"
+    previous = _lock_document(db, candidate_id) if delta else None
+    snapshot, payload = _refresh_document(db, candidate_id)
+    body = _delta_body(snapshot, previous, payload) if delta else payload
+    _add_candidate_event(db, routing_key, candidate_id, body)
+    return snapshot, payload
+
+def _add_candidate_event(db: Session, routing_key: str, candidate_id: UUID, body: bytes):
+    if routing_key == "candidate.updated" and CANDIDATE_EVENT_COALESCE_SECONDS:
+        pending = outbox.get_pending_event(db, routing_key, candidate_id)
+        if pending is not None:
+            delta = CANDIDATE_EVENT_MODE == "delta"
+            pending.body = _merge_delta(pending.body, body) if delta else body
+            OUTBOX_EVENTS_COALESCED.labels(routing_key).inc()
+            return
+        outbox.add_event(db, routing_key, body, candidate_id=candidate_id, delay=CANDIDATE_EVENT_COALESCE_SECONDS)
+    else:
+        outbox.add_event(db, routing_key, body, candidate_id=candidate_id)
+
+def _lock_document(db: Session, candidate_id: UUID) -> dict | None:
+    # The row lock keeps concurrent writers from interleaving between this read and the version bump.
+    db.flush()
+    return db.execute(
+        select(models.Candidate.document)
+        .where(models.Candidate.id == candidate_id)
+        .with_for_update()
+    ).scalar()
+
+def _delta_body(snapshot: models.Candidate, previous: dict | None, payload: bytes) -> bytes:
+    current = orjson.loads(payload)
+    changes = {
+        field: value for field, value in current.items()
+        if previous is None or previous.get(field) != value
+    }
+    return orjson.dumps({
+        "id": current["id"],
+        "telegram_id": current["telegram_id"],
+        "version": snapshot.version + 1,
+        "changes": changes,
+    })
+
+def _merge_delta(pending_body: bytes, body: bytes) -> bytes:
+    pending, latest = orjson.loads(pending_body), orjson.loads(body)
+    latest["changes"] = {**pending["changes"], **latest["changes"]}
+    return orjson.dumps(latest)
+
+def _patch_document(db: Session, candidate_id: UUID, field: str, change, routing_key: str | None = None):
+    # Sub-resource writes replace one list of the stored document instead of
+    # reloading the whole profile: change() maps the current items to the new
+    # ones and the result goes through serialize_candidate, so the bytes match
+    # a full rebuild. Rows without a document get a full rebuild.
+    candidates = models.Candidate.__table__
+    row = db.execute(
+        select(candidates.c.telegram_id, candidates.c.version, cast(candidates.c.document, Text))
+        .where(candidates.c.id == candidate_id)
+        .with_for_update()
+    ).one()
+    if row.document is None:
+        snapshot, payload = _refresh_document(db, candidate_id)
+    else:
+        document = schemas.Candidate.model_validate_json(row.document)
+        setattr(document, field, change(getattr(document, field)))
+        payload = schemas.serialize_candidate(document)
+        _store_documents(db, [(candidate_id, payload)])
+    version = row.version + 1
+    db.info.setdefault("dirty_candidates", set()).add((candidate_id, row.telegram_id))
+
+    if routing_key is None:
+        return
+    if CANDIDATE_EVENT_MODE == "delta":
+        payload = orjson.dumps({
+            "id": str(candidate_id),
+            "telegram_id": row.telegram_id,
+            "version": version,
+            "changes": {field: orjson.loads(payload)[field]},
+        })
+    _add_candidate_event(db, routing_key, candidate_id, payload)
+
+def _store_documents(db: Session, documents: list[tuple[UUID, bytes]]):
+    # updated_at is written back unchanged so storing the document doesn't bump it.
+    if not documents:
+        return
+    candidates = models.Candidate.__table__
+    db.execute(
+        update(candidates)
+        .where(candidates.c.id == bindparam("document_id"))
+        .values(
+            document=cast(bindparam("document_body"), JSON),
+            version=candidates.c.version + 1,
+            updated_at=candidates.c.updated_at,
+        ),
+        [{"document_id": candidate_id, "document_body": payload.decode()} for candidate_id, payload in documents],
+    )
+
+# --- COMMIT HOOKS ---
+def _mark_dirty(db: Session, db_candidate: models.Candidate):
+    db.info.setdefault("dirty_candidates", set()).add((db_candidate.id, db_candidate.telegram_id))
+
+def _track_ranking(db: Session, snapshot: models.Candidate):
+    db.info.setdefault("ranking_updates", []).append(("upsert", RankingEntry(
+        snapshot.id, snapshot.telegram_id, snapshot.status == models.Status.ACTIVE,
+        snapshot.experience_years, snapshot.work_modes,
+        [(skill.skill_id, skill.level) for skill in snapshot.skills],
+    )))
+
+def bump_cache_generation(db: Session):
+    # after_commit only invalidates the cache of the process that wrote, so
+    # writes from the commands are announced through a sequence the API
+    # processes poll. Bumped after the commit: a cache cleared earlier could
+    # refill with the old rows.
+    db.execute(select(models.candidate_cache_generation.next_value()))
+    db.commit()
+
+@event.listens_for(Session, "after_commit")
+def _after_candidates_committed(session: Session):
+    for candidate_id, telegram_id in session.info.pop("dirty_candidates", ()):
+        candidate_cache.invalidate(candidate_id, telegram_id)
+        read_router.pin(candidate_id, telegram_id)
+    candidate_ranking.apply(session.info.pop("ranking_updates", ()))
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty(session: Session):
+    session.info.pop("dirty_candidates", None)
+    session.info.pop("ranking_updates", None)
 
 # --- EXPERIENCE ---
 def _calculate_total_experience(experiences: list[models.Experience]) -> float:
-    if not experiences:
-        return 0.0
+    # Overlapping periods are merged first so parallel jobs aren't counted twice;
+    # _RECOMPUTE_EXPERIENCE_SQL must stay in step with this.
+    periods = sorted(
+        (exp.start_date, exp.end_date or date.today())
+        for exp in experiences
+        if (exp.end_date or date.today()) > exp.start_date
+    )
 
     total_days = 0
-    for exp in experiences:
-        end_date = exp.end_date if exp.end_date else date.today()
-        if end_date > exp.start_date:
-            total_days += (end_date - exp.start_date).days
-
-    return round(total_days / 365.25, 1)
\ No newline at end of file
+    current_start, current_end = None, None
+    for start, end in periods:
+        if current_end is not None and start <= current_end:
+            current_end = max(current_end, end)
+            continue
+        if current_end is not None:
+            total_days += (current_end - current_start).days
+        current_start, current_end = start, end
+    if current_end is not None:
+        total_days += (current_end - current_start).days
+
+    return round(total_days / 365.25, 1)
+
+# Gaps-and-islands over each candidate's periods: a period starts a new island
+# unless it begins before the latest end seen so far. Only rows whose value
+# changes are updated; their stored documents are re-rendered afterwards.
+_RECOMPUTE_EXPERIENCE_SQL = text("""
+WITH periods AS (
+    SELECT candidate_id, start_date, COALESCE(end_date, CURRENT_DATE) AS end_date
+    FROM experiences
+    WHERE candidate_id = ANY(:candidate_ids)
+      AND COALESCE(end_date, CURRENT_DATE) > start_date
+),
+marked AS (
+    SELECT *, CASE WHEN start_date <= MAX(end_date) OVER (
+        PARTITION BY candidate_id ORDER BY start_date, end_date
+        ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+    ) THEN 0 ELSE 1 END AS starts_island
+    FROM periods
+),
+islands AS (
+    SELECT *, SUM(starts_island) OVER (
+        PARTITION BY candidate_id ORDER BY start_date, end_date ROWS UNBOUNDED PRECEDING
+    ) AS island
+    FROM marked
+),
+totals AS (
+    SELECT candidate_id, ROUND(SUM(days) / 365.25, 1) AS years
+    FROM (
+        SELECT candidate_id, MAX(end_date) - MIN(start_date) AS days
+        FROM islands GROUP BY candidate_id, island
+    ) merged
+    GROUP BY candidate_id
+)
+UPDATE candidates c
+SET experience_years = t.years,
+    updated_at = now()
+FROM totals t
+WHERE c.id = t.candidate_id AND c.experience_years IS DISTINCT FROM t.years
+RETURNING c.id, c.telegram_id, c.version, c.experience_years, c.document::text
+""").bindparams(bindparam("candidate_ids", type_=ARRAY(PG_UUID(as_uuid=True))))
+
+def recompute_experience_years(db: Session, limit: int, after: UUID | None = None) -> tuple[int, UUID | None]:
+    # One batch of candidates (by id) per call: returns how many changed and the
+    # id to resume after, or None when done. Candidates without experiences keep
+    # their self-reported value.
+    candidate_ids = db.execute(
+        select(models.Candidate.id)
+        .where(models.Candidate.id > (after or UUID(int=0)))
+        .order_by(models.Candidate.id)
+        .limit(limit)
+    ).scalars().all()
+    if not candidate_ids:
+        return 0, None
+
+    changed = db.execute(_RECOMPUTE_EXPERIENCE_SQL, {"candidate_ids": candidate_ids}).all()
+    missing = {row.id for row in changed if row.document is None}
+    fallback = {document.id: document.document for document in get_candidate_documents(db, list(missing))}
+    payloads = {}
+    for row in changed:
+        if row.document is None:
+            payloads[row.id] = fallback[row.id]
+        else:
+            document = schemas.Candidate.model_validate_json(row.document)
+            document.experience_years = row.experience_years
+            payloads[row.id] = schemas.serialize_candidate(document)
+    _store_documents(db, list(payloads.items()))
+    for row in changed:
+        if CANDIDATE_EVENT_MODE == "delta":
+            body = orjson.dumps({
+                "id": str(row.id),
+                "telegram_id": row.telegram_id,
+                "version": row.version + 1,
+                "changes": {"experience_years": str(row.experience_years)},
+            })
+        else:
+            body = payloads[row.id]
+        _add_candidate_event(db, "candidate.updated", row.id, body)
+        db.info.setdefault("dirty_candidates", set()).add((row.id, row.telegram_id))
+        db.info.setdefault("ranking_updates", []).append(("experience", row.id, row.experience_years))
+    db.commit()
+    if changed:
+        bump_cache_generation(db)
+    return len(changed), candidate_ids[-1]
\ No newline at end of file
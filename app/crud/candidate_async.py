@@ -0,0 +1,102 @@
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.crud import candidate
+from app.crud.candidate import LOAD_FULL, LOAD_HEADER, LOAD_SKILLS, CandidateDocument, CandidateVersion
+
+# Async counterparts of app.crud.candidate. The ORM logic lives in the sync
+# module and runs through AsyncSession.run_sync, so it executes on the async
+# driver without blocking the event loop.
+
+# --- CANDIDATE ---
+async def get_candidate_by_telegram_id(db: AsyncSession, telegram_id: int, profile: str = LOAD_FULL):
+    return await db.run_sync(candidate.get_candidate_by_telegram_id, telegram_id, profile)
+
+async def get_candidate(db: AsyncSession, candidate_id: UUID, profile: str = LOAD_FULL):
+    return await db.run_sync(candidate.get_candidate, candidate_id, profile)
+
+async def reload_candidate(db: AsyncSession, candidate_id: UUID):
+    return await db.run_sync(candidate.reload_candidate, candidate_id)
+
+async def create_candidate(db: AsyncSession, candidate_in: schemas.CandidateCreate):
+    return await db.run_sync(candidate.create_candidate, candidate_in)
+
+async def bulk_create_candidates(
+    db: AsyncSession, candidates: list[schemas.CandidateCreate]
+) -> dict[int, UUID]:
+    return await db.run_sync(candidate.bulk_create_candidates, candidates)
+
+async def update_candidate(
+    db: AsyncSession, db_candidate: models.Candidate, candidate_in: schemas.CandidateUpdate
+):
+    return await db.run_sync(candidate.update_candidate, db_candidate, candidate_in)
+
+async def delete_candidate(db: AsyncSession, candidate_id: UUID):
+    return await db.run_sync(candidate.delete_candidate, candidate_id)
+
+async def bulk_delete_candidates(db: AsyncSession, candidate_ids: list[UUID], telegram_ids: list[int]) -> list:
+    return await db.run_sync(candidate.bulk_delete_candidates, candidate_ids, telegram_ids)
+
+# --- DOCUMENTS ---
+async def get_candidate_document(db: AsyncSession, candidate_id: UUID) -> CandidateDocument | None:
+    return await db.run_sync(candidate.get_candidate_document, candidate_id)
+
+async def get_candidate_document_by_telegram_id(db: AsyncSession, telegram_id: int) -> CandidateDocument | None:
+    return await db.run_sync(candidate.get_candidate_document_by_telegram_id, telegram_id)
+
+async def get_candidate_documents_page(db: AsyncSession, limit: int, after=None) -> list[CandidateDocument]:
+    return await db.run_sync(candidate.get_candidate_documents_page, limit, after)
+
+async def search_candidate_documents(
+    db: AsyncSession, filters: schemas.CandidateSearchFilters, limit: int, after=None
+) -> list[CandidateDocument]:
+    return await db.run_sync(candidate.search_candidate_documents, filters, limit, after)
+
+async def get_candidate_documents(db: AsyncSession, candidate_ids: list[UUID]) -> list[CandidateDocument]:
+    return await db.run_sync(candidate.get_candidate_documents, candidate_ids)
+
+async def get_candidate_documents_by_telegram_ids(db: AsyncSession, telegram_ids: list[int]) -> list[CandidateDocument]:
+    return await db.run_sync(candidate.get_candidate_documents_by_telegram_ids, telegram_ids)
+
+async def get_candidate_version(db: AsyncSession, candidate_id: UUID) -> CandidateVersion | None:
+    return await db.run_sync(candidate.get_candidate_version, candidate_id)
+
+async def get_candidate_version_by_telegram_id(db: AsyncSession, telegram_id: int) -> CandidateVersion | None:
+    return await db.run_sync(candidate.get_candidate_version_by_telegram_id, telegram_id)
+
+async def get_candidate_versions_page(db: AsyncSession, limit: int, after=None) -> list[CandidateVersion]:
+    return await db.run_sync(candidate.get_candidate_versions_page, limit, after)
+
+async def search_candidate_versions(
+    db: AsyncSession, filters: schemas.CandidateSearchFilters, limit: int, after=None
+) -> list[CandidateVersion]:
+    return await db.run_sync(candidate.search_candidate_versions, filters, limit, after)
+
+# --- RESUME ---
+async def get_resume_file_id(db: AsyncSession, telegram_id: int) -> UUID | None:
+    return await db.run_sync(candidate.get_resume_file_id, telegram_id)
+
+async def replace_resume(db: AsyncSession, candidate_id: UUID, resume_in: schemas.ResumeCreate):
+    return await db.run_sync(candidate.replace_resume, candidate_id, resume_in)
+
+async def delete_resume(db: AsyncSession, candidate_id: UUID):
+    return await db.run_sync(candidate.delete_resume, candidate_id)
+
+# --- PROJECT ---
+async def add_project(db: AsyncSession, candidate_id: UUID, project_in: schemas.ProjectCreate):
+    return await db.run_sync(candidate.add_project, candidate_id, project_in)
+
+async def delete_project(db: AsyncSession, project_id: UUID):
+    return await db.run_sync(candidate.delete_project, project_id)
+
+# --- AVATAR ---
+async def get_avatar_file_id(db: AsyncSession, telegram_id: int) -> UUID | None:
+    return await db.run_sync(candidate.get_avatar_file_id, telegram_id)
+
+async def replace_avatar(db: AsyncSession, candidate_id: UUID, telegram_id: int, avatar_in: schemas.AvatarCreate):
+    return await db.run_sync(candidate.replace_avatar, candidate_id, telegram_id, avatar_in)
+
+async def delete_avatar(db: AsyncSession, candidate_id: UUID):
+    return await db.run_sync(candidate.delete_avatar, candidate_id)
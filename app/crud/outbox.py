@@ -0,0 +1,49 @@
+from datetime import timedelta
+from uuid import UUID
+
+from sqlalchemy import insert, delete, func
+from sqlalchemy.orm import Session
+from app.core.config import OUTBOX_MAX_ATTEMPTS
+from app.models.outbox import OutboxEvent
+
+# --- OUTBOX ---
+def add_event(
+    db: Session, routing_key: str, body: bytes, candidate_id: UUID | None = None, delay: float = 0.0
+) -> OutboxEvent:
+    db_event = OutboxEvent(routing_key=routing_key, body=body, candidate_id=candidate_id)
+    if delay:
+        db_event.available_at = func.now() + timedelta(seconds=delay)
+    db.add(db_event)
+    return db_event
+
+def add_events(db: Session, events: list[tuple[str, bytes, UUID | None]]):
+    if events:
+        db.execute(
+            insert(OutboxEvent),
+            [
+                {"routing_key": routing_key, "body": body, "candidate_id": candidate_id}
+                for routing_key, body, candidate_id in events
+            ],
+        )
+
+def get_pending_event(db: Session, routing_key: str, candidate_id: UUID) -> OutboxEvent | None:
+    # Rows the relay has locked are being published and must not be touched;
+    # parked rows are never published, so nothing may be merged into them.
+    return (
+        db.query(OutboxEvent)
+        .filter(
+            OutboxEvent.routing_key == routing_key,
+            OutboxEvent.candidate_id == candidate_id,
+            OutboxEvent.attempts < OUTBOX_MAX_ATTEMPTS,
+        )
+        .order_by(OutboxEvent.id.desc())
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+
+def discard_pending_events(db: Session, routing_key: str, candidate_ids: list[UUID]):
+    db.execute(
+        delete(OutboxEvent)
+        .where(OutboxEvent.routing_key == routing_key, OutboxEvent.candidate_id.in_(candidate_ids))
+        .execution_options(synchronize_session=False)
+    )
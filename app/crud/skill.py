@@ -0,0 +1,78 @@
+from sqlalchemy import event, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app import models
+from app.services.skill_index import normalize_skill, skill_index
+
+# --- SKILLS ---
+# Free-form names are stored once in `skills`; candidate_skills references them
+# by integer id. A name resolves through its normalized key, either a skill's
+# own key or an alias pointing at the canonical skill.
+def skill_ids_for_key(key: str):
+    return union_all(
+        select(models.Skill.id).where(models.Skill.key == key),
+        select(models.SkillAlias.skill_id).where(models.SkillAlias.key == key),
+    )
+
+def _lookup(db: Session, keys: list[str]) -> dict[str, int]:
+    return dict(db.execute(union_all(
+        select(models.Skill.key, models.Skill.id).where(models.Skill.key.in_(keys)),
+        select(models.SkillAlias.key, models.SkillAlias.skill_id).where(models.SkillAlias.key.in_(keys)),
+    )).all())
+
+def resolve_skill_ids(db: Session, names) -> dict[str, int]:
+    # One lookup for known names; unseen ones are inserted in a single statement.
+    # The first spelling written becomes the canonical name.
+    spellings = {}
+    for name in names:
+        spellings.setdefault(normalize_skill(name), " ".join(name.split()))
+    if not spellings:
+        return {}
+
+    ids = _lookup(db, list(spellings))
+    missing = sorted(key for key in spellings if key not in ids)
+    if missing:
+        created = db.execute(
+            pg_insert(models.Skill)
+            .values([{"name": spellings[key], "key": key} for key in missing])
+            .on_conflict_do_nothing(index_elements=[models.Skill.key])
+            .returning(models.Skill.id, models.Skill.name, models.Skill.key)
+        ).all()
+        db.info.setdefault("new_skills", []).extend(tuple(row) for row in created)
+        ids.update({key: skill_id for skill_id, _, key in created})
+        # Keys inserted by a concurrent transaction come back empty above.
+        raced = [key for key in missing if key not in ids]
+        if raced:
+            ids.update(_lookup(db, raced))
+    return {name: ids[normalize_skill(name)] for name in names}
+
+def add_skill_alias(db: Session, alias: str, skill_name: str) -> int | None:
+    # Returns the canonical skill id, or None when the alias is already a skill
+    # of its own (merging two skills is not supported here).
+    key = normalize_skill(alias)
+    existing = _lookup(db, [key]).get(key)
+    skill_id = resolve_skill_ids(db, [skill_name])[skill_name]
+    if existing == skill_id:
+        db.commit()
+        return skill_id
+    if db.execute(select(models.Skill.id).where(models.Skill.key == key)).first():
+        db.rollback()
+        return None
+
+    db.execute(
+        pg_insert(models.SkillAlias)
+        .values(key=key, skill_id=skill_id)
+        .on_conflict_do_update(index_elements=[models.SkillAlias.key], set_={"skill_id": skill_id})
+    )
+    db.commit()
+    return skill_id
+
+# --- COMMIT HOOKS ---
+@event.listens_for(Session, "after_commit")
+def _after_skills_committed(session: Session):
+    for skill_id, name, key in session.info.pop("new_skills", ()):
+        skill_index.add_skill(skill_id, name, key)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_new_skills(session: Session):
+    session.info.pop("new_skills", None)
@@ -1,22 +1,157 @@
-from fastapi import FastAPI
+import time
+
+# Taken before the application modules are imported, so the startup metrics
+# include import time.
+PROCESS_STARTED = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from starlette.datastructures import MutableHeaders
 from app.api.v1.api import api_router
+from app.core.config import READINESS_REQUIRES_BROKER, READINESS_DB_TIMEOUT
+from app.core.metrics import (
+    HTTP_REQUEST_SECONDS, DB_STATEMENTS_PER_REQUEST, DB_SECONDS_PER_REQUEST,
+    APP_STARTUP_SECONDS, APP_FIRST_REQUEST_SECONDS,
+)
+from app.core.admission import AdmissionMiddleware
+from app.core.db import start_request_stats, warm_up_pools, ping_database
 from app.services.publisher import publisher
+from app.services.outbox_relay import outbox_relay
+from app.services.file_service import file_service
+from app.services.skill_index import skill_index
+from app.services.candidate_ranking import candidate_ranking
+from app.services.candidate_cache import candidate_cache
+
+PROBE_PATHS = {"/healthz", "/readyz", "/metrics"}
+startup_state = {"started": False, "first_request_seen": False}
 
-app = FastAPI(title="Candidate Service")
 
-@app.on_event("startup")
-async def startup_event():
+def _record_phase(phase: str, started: float) -> float:
+    now = time.perf_counter()
+    APP_STARTUP_SECONDS.labels(phase).set(now - started)
+    return now
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     print("Application startup...")
-    await publisher.connect()
+    phase_started = _record_phase("import", PROCESS_STARTED)
+    try:
+        await warm_up_pools()
+    except Exception as e:
+        # Not fatal: /readyz keeps reporting the database until it is reachable.
+        print(f"Database warm-up failed: {e}")
+    phase_started = _record_phase("db_warm_up", phase_started)
+
+    publisher.start(on_connected=outbox_relay.notify)
+    await file_service.start()
+    skill_index.start()
+    candidate_ranking.start()
+    candidate_cache.start()
+    outbox_relay.start()
+    _record_phase("services", phase_started)
+    _record_phase("total", PROCESS_STARTED)
+    startup_state["started"] = True
+    print(f"Application started in {time.perf_counter() - PROCESS_STARTED:.2f}s")
+
+    yield
 
-@app.on_event("shutdown")
-async def shutdown_event():
     print("Application shutdown...")
+    await outbox_relay.stop()
+    await candidate_cache.stop()
+    await candidate_ranking.stop()
+    await skill_index.stop()
+    await file_service.close()
     await publisher.close()
 
+class RequestStatsMiddleware:
+    # Plain ASGI so that a streamed response is measured once its last chunk
+    # is sent. The headers go out before the body, so for streams they only
+    # count the statements run up to the first chunk; the metrics count all.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = start_request_stats()
+        started = time.perf_counter()
+        status_code = 500
+        recorded = False
+
+        def record():
+            nonlocal recorded
+            recorded = True
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route_path, status_code).observe(
+                time.perf_counter() - started
+            )
+            DB_STATEMENTS_PER_REQUEST.labels(route_path).observe(stats["queries"])
+            DB_SECONDS_PER_REQUEST.labels(route_path).observe(stats["db_seconds"])
+            if not startup_state["first_request_seen"] and route_path not in PROBE_PATHS:
+                startup_state["first_request_seen"] = True
+                APP_FIRST_REQUEST_SECONDS.set(time.perf_counter() - PROCESS_STARTED)
+
+        async def send_with_stats(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(stats["queries"])
+                if stats["profiles"]:
+                    headers["X-Loader-Profile"] = ",".join(stats["profiles"])
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            # Errors and client disconnects end the request without a final chunk.
+            if not recorded:
+                record()
+
+app = FastAPI(title="Candidate Service", lifespan=lifespan)
+
+app.add_middleware(RequestStatsMiddleware)
+# Added last so it runs first: shed requests never reach the routes or the pool.
+app.add_middleware(AdmissionMiddleware)
+
 app.include_router(api_router, prefix="/v1")
 
 
+@app.get("/healthz", include_in_schema=False)
+def healthz():
+    # Liveness only: the process is up and serving the event loop.
+    return {"status": "ok"}
+
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    checks = {
+        "started": startup_state["started"],
+        "database": await ping_database(READINESS_DB_TIMEOUT),
+        "broker": publisher.is_connected,
+        "skill_index": skill_index.ready,
+        "ranking": candidate_ranking.ready,
+    }
+    required = ["started", "database", "skill_index"]
+    if READINESS_REQUIRES_BROKER:
+        required.append("broker")
+    ready = all(checks[name] for name in required)
+    return ORJSONResponse({"ready": ready, **checks}, status_code=200 if ready else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Candidate Service"}
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy import (
     Column,
     String,
@@ -8,10 +8,15 @@ from sqlalchemy import (
     func,
     ForeignKey,
     SmallInteger,
+    Integer,
     Text,
-    Date
+    Date,
+    Index,
+    Sequence,
+    DDL,
+    event,
 )
-from sqlalchemy.dialects.postgresql import UUID, BIGINT, JSONB, NUMERIC
+from sqlalchemy.dialects.postgresql import UUID, BIGINT, JSON, JSONB, NUMERIC
 from app.core.db import Base
 import enum
 
@@ -19,7 +24,7 @@ import enum
 class Avatar(Base):
     __tablename__ = "avatars"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"), nullable=False)
+    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False)
     file_id = Column(UUID(as_uuid=True), nullable=False, unique=True)
     created_at = Column(DateTime, server_default=func.now())
     candidate = relationship("Candidate", back_populates="avatars")
@@ -42,22 +47,49 @@ class SkillKind(str, enum.Enum):
     TOOL = "tool"
     LANGUAGE = "language"
 
+class Skill(Base):
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    # Normalized spelling (see services.skill_index.normalize_skill).
+    key = Column(String(100), nullable=False, unique=True)
+    created_at = Column(DateTime, server_default=func.now())
+
+class SkillAlias(Base):
+    __tablename__ = "skill_aliases"
+
+    id = Column(Integer, primary_key=True)
+    key = Column(String(100), nullable=False, unique=True)
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), nullable=False)
+
+    skill = relationship("Skill")
+
 class CandidateSkill(Base):
     __tablename__ = "candidate_skills"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"), nullable=False)
-    skill = Column(String(100), nullable=False)
+    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False)
+    skill_id = Column(Integer, ForeignKey("skills.id"), nullable=False)
     kind = Column(SQLAlchemyEnum(SkillKind), nullable=False)
     level = Column(SmallInteger, nullable=True)
     
     candidate = relationship("Candidate", back_populates="skills")
+    skill_ref = relationship("Skill", lazy="joined", innerjoin=True)
+
+    __table_args__ = (
+        Index("ix_candidate_skills_skill_id_level", skill_id, level),
+    )
+
+    @property
+    def skill(self) -> str:
+        return self.skill_ref.name
 
 # --- RESUME ---
 class Resume(Base):
     __tablename__ = "resumes"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"), nullable=False)
+    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False)
     file_id = Column(UUID(as_uuid=True), nullable=False, unique=True)
     created_at = Column(DateTime, server_default=func.now())
     candidate = relationship("Candidate", back_populates="resumes")
@@ -67,7 +99,7 @@ class Project(Base):
     __tablename__ = "projects"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"), nullable=False)
+    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     links = Column(JSONB)
@@ -79,7 +111,7 @@ class Experience(Base):
     __tablename__ = "experiences"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"), nullable=False)
+    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False)
     company = Column(String(255), nullable=False)
     position = Column(String(255), nullable=False)
     start_date = Column(Date, nullable=False)
@@ -104,9 +136,35 @@ class Candidate(Base):
     status = Column(SQLAlchemyEnum(Status), default=Status.ACTIVE, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # Serialized schemas.Candidate, rebuilt by every crud write; deferred so ORM loads skip it.
+    # json rather than jsonb: the serializer's bytes are kept verbatim and served as is.
+    document = deferred(Column(JSON, nullable=True))
+    # Bumped together with the document, so child-table changes count too.
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    skills = relationship("CandidateSkill", back_populates="candidate", cascade="all, delete-orphan", passive_deletes=True, lazy="select")
+    resumes = relationship("Resume", back_populates="candidate", cascade="all, delete-orphan", passive_deletes=True, lazy="select")
+    projects = relationship("Project", back_populates="candidate", cascade="all, delete-orphan", passive_deletes=True, lazy="select")
+    experiences = relationship("Experience", back_populates="candidate", cascade="all, delete-orphan", passive_deletes=True, lazy="select")
+    avatars = relationship("Avatar", back_populates="candidate", cascade="all, delete-orphan", passive_deletes=True, lazy="select")
+
+    __table_args__ = (
+        Index("ix_candidates_status_experience", status, experience_years),
+        Index("ix_candidates_created_at_id", created_at, id),
+        Index("ix_candidates_work_modes", work_modes, postgresql_using="gin"),
+        Index(
+            "ix_candidates_location_trgm",
+            location,
+            postgresql_using="gin",
+            postgresql_ops={"location": "gin_trgm_ops"},
+        ),
+    )
+
+event.listen(
+    Candidate.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
 
-    skills = relationship("CandidateSkill", back_populates="candidate", cascade="all, delete-orphan", lazy="joined")
-    resumes = relationship("Resume", back_populates="candidate", cascade="all, delete-orphan", lazy="joined")
-    projects = relationship("Project", back_populates="candidate", cascade="all, delete-orphan", lazy="joined")
-    experiences = relationship("Experience", back_populates="candidate", cascade="all, delete-orphan", lazy="joined")
-    avatars = relationship("Avatar", back_populates="candidate", cascade="all, delete-orphan", lazy="joined")
+# --- CACHE GENERATION ---
+# Bumped by the maintenance commands after writing candidates; API processes
+# clear their candidate cache when it moves (see services.candidate_cache).
+candidate_cache_generation = Sequence("candidate_cache_generation", metadata=Base.metadata)
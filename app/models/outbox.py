@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime, func, SmallInteger, Text, LargeBinary
+from sqlalchemy.dialects.postgresql import BIGINT, UUID
+from app.core.db import Base
+
+# --- OUTBOX ---
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    id = Column(BIGINT, primary_key=True, autoincrement=True)
+    routing_key = Column(String(255), nullable=False)
+    body = Column(LargeBinary, nullable=False)
+    attempts = Column(SmallInteger, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    # Set for candidate events so pending ones can be coalesced per candidate.
+    candidate_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    available_at = Column(DateTime, server_default=func.now(), nullable=False)
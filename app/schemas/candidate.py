@@ -1,9 +1,10 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from uuid import UUID
 from decimal import Decimal
 from datetime import datetime, date
-from app.models.candidate import SkillKind
+from app.core.metrics import SERIALIZATION_SECONDS
+from app.models.candidate import SkillKind, Status
 
 # --- AVATAR ---
 class AvatarBase(BaseModel):
@@ -18,6 +19,9 @@ class Avatar(AvatarBase):
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
+class AvatarDownloadLink(BaseModel):
+    download_url: str
+
 # --- EXPERIENCE ---
 class ExperienceBase(BaseModel):
     company: str = Field(..., max_length=255)
@@ -73,8 +77,12 @@ class Resume(ResumeBase):
     model_config = ConfigDict(from_attributes=True)
 
 # --- SKILLS ---
+class SkillSuggestion(BaseModel):
+    id: int
+    name: str
+
 class CandidateSkillBase(BaseModel):
-    skill: str
+    skill: str = Field(..., min_length=1, max_length=100)
     kind: SkillKind
     level: Optional[int] = Field(None, ge=1, le=5)
 
@@ -112,6 +120,33 @@ class Candidate(CandidateBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+def serialize_candidate(db_candidate) -> bytes:
+    with SERIALIZATION_SECONDS.time():
+        candidate = Candidate.model_validate(db_candidate)
+        return candidate.__pydantic_serializer__.to_json(candidate)
+
+class CandidateBatchGet(BaseModel):
+    ids: List[UUID] = Field(default_factory=list, max_length=1000)
+    telegram_ids: List[int] = Field(default_factory=list, max_length=1000)
+
+class CandidateBatchItem(BaseModel):
+    id: Optional[UUID] = None
+    telegram_id: Optional[int] = None
+    found: bool
+    candidate: Optional[Candidate] = None
+
+class CandidateBatchGetResponse(BaseModel):
+    items: List[CandidateBatchItem]
+
+class CandidateBulkDelete(BaseModel):
+    ids: List[UUID] = Field(default_factory=list, max_length=100000)
+    telegram_ids: List[int] = Field(default_factory=list, max_length=100000)
+
+class BulkDeleteReport(BaseModel):
+    deleted: int = 0
+    deleted_ids: List[UUID] = Field(default_factory=list)
+    files_deleted: int = 0
+
 class CandidateUpdate(BaseModel):
     display_name: Optional[str] = None
     headline_role: Optional[str] = None
@@ -123,4 +158,50 @@ class CandidateUpdate(BaseModel):
     skills: Optional[List[CandidateSkillCreate]] = None
     projects: Optional[List[ProjectCreate]] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class CandidateSearchFilters(BaseModel):
+    skills: List[str] = Field(default_factory=list)
+    skill_kind: Optional[SkillKind] = None
+    min_skill_level: Optional[int] = Field(None, ge=1, le=5)
+    location: Optional[str] = Field(None, min_length=3)
+    min_experience: Optional[Decimal] = Field(None, ge=0, le=65)
+    max_experience: Optional[Decimal] = Field(None, ge=0, le=65)
+    work_modes: List[str] = Field(default_factory=list)
+    status: Optional[Status] = None
+
+# --- RANKING ---
+class RankSkill(BaseModel):
+    skill: str = Field(..., min_length=1, max_length=100)
+    weight: float = Field(1.0, gt=0, le=100)
+    min_level: Optional[int] = Field(None, ge=1, le=5)
+
+class CandidateRankRequest(BaseModel):
+    skills: List[RankSkill] = Field(..., min_length=1, max_length=50)
+    min_experience: Optional[Decimal] = Field(None, ge=0, le=65)
+    work_modes: List[str] = Field(default_factory=list)
+    limit: int = Field(20, ge=1, le=500)
+
+class RankedCandidate(BaseModel):
+    id: UUID
+    telegram_id: int
+    score: float
+
+class CandidateRankResponse(BaseModel):
+    items: List[RankedCandidate]
+    # Requested skills not in the skill dictionary; they do not count toward scores.
+    unknown_skills: List[str] = Field(default_factory=list)
+
+# --- BULK IMPORT ---
+class BulkImportItemResult(BaseModel):
+    index: int
+    status: Literal["created", "duplicate", "invalid"]
+    telegram_id: Optional[int] = None
+    id: Optional[UUID] = None
+    error: Optional[str] = None
+
+class BulkImportReport(BaseModel):
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    items: List[BulkImportItemResult] = Field(default_factory=list)
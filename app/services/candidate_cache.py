@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from uuid import UUID
+from sqlalchemy import text
+from app.core.config import CANDIDATE_CACHE_SIZE, CANDIDATE_CACHE_TTL, CANDIDATE_CACHE_SYNC_INTERVAL
+from app.core.db import AsyncSessionLocal
+from app.core.metrics import CANDIDATE_CACHE_REQUESTS, CANDIDATE_CACHE_INVALIDATIONS
+
+# --- BACKENDS ---
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float): ...
+
+    @abstractmethod
+    def delete(self, *keys: str): ...
+
+    @abstractmethod
+    def clear(self): ...
+
+
+class InMemoryLRUBackend(CacheBackend):
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# --- CANDIDATE CACHE ---
+class CandidateCache:
+    # Writes made through this process invalidate their keys on commit. Writes
+    # from app.commands (recompute_experience, rebuild_documents) bump the
+    # candidate_cache_generation sequence instead, and the whole cache is
+    # cleared when a poll sees it move: they show up within sync_interval.
+    # Writes from other API processes still only show up once the TTL expires.
+    def __init__(self, backend: CacheBackend, ttl: float, sync_interval: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.sync_interval = sync_interval
+        self._generation = 0
+        self._db_generation = None
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"Candidate cache sync failed: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    async def sync(self):
+        # is_called tells a fresh sequence apart from one bumped once: both
+        # report last_value 1.
+        async with AsyncSessionLocal() as db:
+            generation = tuple((await db.execute(
+                text("SELECT last_value, is_called FROM candidate_cache_generation")
+            )).one())
+        if self._db_generation is not None and generation != self._db_generation:
+            print(f"Candidate cache cleared: generation {generation[0]}")
+            self.clear()
+        self._db_generation = generation
+
+    @staticmethod
+    def _keys(candidate_id: UUID, telegram_id: int) -> tuple[str, str]:
+        return f"candidate:id:{candidate_id}", f"candidate:tg:{telegram_id}"
+
+    def _get(self, key: str) -> tuple[bytes, str] | None:
+        # Entries are stored as b"<etag>\n<payload>" so any bytes backend can hold them.
+        value = self.backend.get(key)
+        CANDIDATE_CACHE_REQUESTS.labels("hit" if value is not None else "miss").inc()
+        if value is None:
+            return None
+        etag, payload = value.split(b"\n", 1)
+        return payload, etag.decode()
+
+    def get_by_id(self, candidate_id: UUID) -> tuple[bytes, str] | None:
+        return self._get(f"candidate:id:{candidate_id}")
+
+    def get_by_telegram_id(self, telegram_id: int) -> tuple[bytes, str] | None:
+        return self._get(f"candidate:tg:{telegram_id}")
+
+    def read_token(self) -> int:
+        return self._generation
+
+    def store(self, payload: bytes, etag: str, candidate_id: UUID, telegram_id: int, token: int):
+        # A write committed after the read started may make payload stale.
+        if token != self._generation:
+            return
+        value = etag.encode() + b"\n" + payload
+        for key in self._keys(candidate_id, telegram_id):
+            self.backend.set(key, value, self.ttl)
+
+    def invalidate(self, candidate_id: UUID, telegram_id: int):
+        self._generation += 1
+        CANDIDATE_CACHE_INVALIDATIONS.inc()
+        self.backend.delete(*self._keys(candidate_id, telegram_id))
+
+    def clear(self):
+        self._generation += 1
+        CANDIDATE_CACHE_INVALIDATIONS.inc()
+        self.backend.clear()
+
+candidate_cache = CandidateCache(
+    InMemoryLRUBackend(CANDIDATE_CACHE_SIZE), CANDIDATE_CACHE_TTL, CANDIDATE_CACHE_SYNC_INTERVAL
+)
@@ -0,0 +1,320 @@
+import asyncio
+import threading
+import time
+from typing import NamedTuple
+from uuid import UUID
+
+import numpy as np
+import orjson
+from sqlalchemy import Text, cast, func, select
+
+from app.core.config import CANDIDATE_RANKING_RELOAD_INTERVAL
+from app.core.db import read_router
+from app.core.metrics import CANDIDATE_RANKING_SECONDS, CANDIDATE_RANKING_RELOAD_SECONDS
+from app.models.candidate import Candidate, CandidateSkill, Status
+
+
+class RankingEntry(NamedTuple):
+    id: UUID
+    telegram_id: int
+    active: bool
+    experience_years: float | None
+    work_modes: list[str]
+    skills: list[tuple[int, int | None]]
+
+
+class RequiredSkill(NamedTuple):
+    skill_id: int
+    weight: float
+    min_level: int | None
+
+
+# --- MATRIX ---
+class _Matrix:
+    # Candidate x skill levels stored column-wise: for every skill, the sorted
+    # candidate rows that have it and their levels (uint8, a missing level counts
+    # as 1). Per-candidate filters live in dense arrays indexed by row. Deleted
+    # candidates keep their row until the next reload.
+    def __init__(self, capacity: int = 1024):
+        capacity = max(capacity, 1024)
+        self.size = 0
+        self.ids: list[UUID] = []
+        self.row_of: dict[UUID, int] = {}
+        self.telegram_ids = np.zeros(capacity, np.int64)
+        self.active = np.zeros(capacity, np.bool_)
+        self.experience = np.full(capacity, np.nan, np.float32)
+        self.modes = np.zeros(capacity, np.uint64)
+        self.mode_bits: dict[str, int] = {}
+        self.columns: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        # Skill ids per row as loaded (sorted by row), plus rows changed since.
+        self.loaded_rows = np.zeros(0, np.int32)
+        self.loaded_skills = np.zeros(0, np.int32)
+        self.row_skills: dict[int, tuple[int, ...]] = {}
+
+    def _row(self, candidate_id: UUID, telegram_id: int) -> int:
+        row = self.row_of.get(candidate_id)
+        if row is not None:
+            return row
+        if self.size == len(self.telegram_ids):
+            capacity = self.size * 2
+            self.telegram_ids = np.resize(self.telegram_ids, capacity)
+            self.active = np.resize(self.active, capacity)
+            self.experience = np.concatenate([self.experience, np.full(self.size, np.nan, np.float32)])
+            self.modes = np.resize(self.modes, capacity)
+        row = self.size
+        self.size += 1
+        self.ids.append(candidate_id)
+        self.row_of[candidate_id] = row
+        self.telegram_ids[row] = telegram_id
+        self.active[row] = False
+        self.modes[row] = 0
+        return row
+
+    def _mode_mask(self, work_modes, create: bool) -> int:
+        # One bit per distinct work mode; modes past the 64th are not filterable.
+        mask = 0
+        for mode in work_modes or ():
+            bit = self.mode_bits.get(mode)
+            if bit is None and create and len(self.mode_bits) < 64:
+                bit = self.mode_bits[mode] = len(self.mode_bits)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def _set_level(self, skill_id: int, row: int, level: int):
+        column = self.columns.get(skill_id)
+        if column is None:
+            self.columns[skill_id] = (np.array([row], np.int32), np.array([level], np.uint8))
+            return
+        rows, levels = column
+        i = np.searchsorted(rows, row)
+        if i < len(rows) and rows[i] == row:
+            levels[i] = level
+        else:
+            self.columns[skill_id] = (np.insert(rows, i, row), np.insert(levels, i, level))
+
+    def _remove_level(self, skill_id: int, row: int):
+        rows, levels = self.columns[skill_id]
+        i = np.searchsorted(rows, row)
+        if i < len(rows) and rows[i] == row:
+            if len(rows) == 1:
+                del self.columns[skill_id]
+            else:
+                self.columns[skill_id] = (np.delete(rows, i), np.delete(levels, i))
+
+    def _skills_of(self, row: int) -> tuple[int, ...]:
+        skills = self.row_skills.get(row)
+        if skills is None:
+            start, end = np.searchsorted(self.loaded_rows, [row, row + 1])
+            skills = tuple(self.loaded_skills[start:end].tolist())
+        return skills
+
+    def upsert(self, entry: RankingEntry):
+        row = self._row(entry.id, entry.telegram_id)
+        self.active[row] = entry.active
+        self.experience[row] = np.nan if entry.experience_years is None else float(entry.experience_years)
+        self.modes[row] = self._mode_mask(entry.work_modes, create=True)
+
+        levels = {}
+        for skill_id, level in entry.skills:
+            levels[skill_id] = max(levels.get(skill_id, 0), level or 1)
+        for skill_id in self._skills_of(row):
+            if skill_id not in levels:
+                self._remove_level(skill_id, row)
+        for skill_id, level in levels.items():
+            self._set_level(skill_id, row, level)
+        self.row_skills[row] = tuple(levels)
+
+    def delete(self, candidate_id: UUID):
+        row = self.row_of.pop(candidate_id, None)
+        if row is None:
+            return
+        self.active[row] = False
+        for skill_id in self._skills_of(row):
+            self._remove_level(skill_id, row)
+        self.row_skills[row] = ()
+
+    def set_experience(self, candidate_id: UUID, experience_years):
+        row = self.row_of.get(candidate_id)
+        if row is not None:
+            self.experience[row] = np.nan if experience_years is None else float(experience_years)
+
+    def rank(
+        self, skills: list[RequiredSkill], min_experience: float | None, work_modes: list[str], limit: int
+    ) -> list[tuple[UUID, int, float]]:
+        # A skill scores 1 when the level meets min_level and level / min_level
+        # below it; the result is the weighted mean over the required skills.
+        size = self.size
+        scores = np.zeros(size, np.float32)
+        for skill_id, weight, min_level in skills:
+            column = self.columns.get(skill_id)
+            if column is None:
+                continue
+            rows, levels = column
+            if min_level:
+                scores[rows] += weight * np.minimum(levels / np.float32(min_level), 1)
+            else:
+                scores[rows] += weight
+
+        mask = self.active[:size] & (scores > 0)
+        if min_experience is not None:
+            mask &= self.experience[:size] >= min_experience
+        if work_modes:
+            wanted = self._mode_mask(work_modes, create=False)
+            mask &= (self.modes[:size] & np.uint64(wanted)) != 0
+
+        rows = np.flatnonzero(mask)
+        if len(rows) > limit:
+            rows = rows[np.argpartition(-scores[rows], limit - 1)[:limit]]
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
+        total = sum(skill.weight for skill in skills)
+        return [
+            (self.ids[row], int(self.telegram_ids[row]), float(scores[row]) / total)
+            for row in rows.tolist()
+        ]
+
+    @classmethod
+    def load(cls) -> "_Matrix":
+        # Both queries share one snapshot, so the row numbers assigned by the
+        # skills query match the candidates' order. Skills come back as three
+        # integer arrays to avoid building a Python row per candidate skill.
+        candidates = Candidate.__table__
+        candidate_skills = CandidateSkill.__table__
+        with read_router.sync_session() as db:
+            conn = db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            rows = conn.execute(
+                select(
+                    candidates.c.id, candidates.c.telegram_id, candidates.c.status,
+                    candidates.c.experience_years, cast(candidates.c.work_modes, Text),
+                ).order_by(candidates.c.id)
+            ).all()
+            numbered = select(
+                candidates.c.id, (func.row_number().over(order_by=candidates.c.id) - 1).label("row")
+            ).cte("numbered")
+            skill_rows, skill_ids, levels = conn.execute(
+                select(
+                    func.array_agg(numbered.c.row),
+                    func.array_agg(candidate_skills.c.skill_id),
+                    func.array_agg(func.coalesce(candidate_skills.c.level, 1)),
+                ).select_from(candidate_skills.join(numbered, numbered.c.id == candidate_skills.c.candidate_id))
+            ).one()
+
+        matrix = cls(len(rows) + len(rows) // 4)
+        masks = {}
+        for candidate_id, telegram_id, status, experience_years, work_modes in rows:
+            row = matrix._row(candidate_id, telegram_id)
+            matrix.active[row] = status == Status.ACTIVE
+            if experience_years is not None:
+                matrix.experience[row] = float(experience_years)
+            # Few distinct work_modes lists exist, so each is decoded once.
+            mask = masks.get(work_modes)
+            if mask is None:
+                mask = masks[work_modes] = matrix._mode_mask(orjson.loads(work_modes or "null"), create=True)
+            matrix.modes[row] = mask
+        if not skill_rows:
+            return matrix
+
+        rows = np.array(skill_rows, np.int32)
+        skill_ids = np.array(skill_ids, np.int32)
+        levels = np.array(levels, np.uint8)
+
+        # Sort by skill, then row, then level, and keep the highest level per (skill, row).
+        order = np.lexsort((levels, rows, skill_ids))
+        rows, skill_ids, levels = rows[order], skill_ids[order], levels[order]
+        last = np.ones(len(rows), np.bool_)
+        last[:-1] = (skill_ids[1:] != skill_ids[:-1]) | (rows[1:] != rows[:-1])
+        rows, skill_ids, levels = rows[last], skill_ids[last], levels[last]
+
+        bounds = np.flatnonzero(np.r_[True, skill_ids[1:] != skill_ids[:-1], True])
+        for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            matrix.columns[int(skill_ids[start])] = (rows[start:end], levels[start:end])
+
+        by_row = np.argsort(rows, kind="stable")
+        matrix.loaded_rows = rows[by_row]
+        matrix.loaded_skills = skill_ids[by_row]
+        return matrix
+
+
+# --- RANKING INDEX ---
+class CandidateRanking:
+    def __init__(self, reload_interval: float):
+        self.reload_interval = reload_interval
+        self.ready = False
+        self._matrix = _Matrix()
+        self._lock = threading.Lock()
+        # Updates committed while a reload runs; replayed onto the new matrix.
+        self._replay: list | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        # Loads in the background; /rank answers 503 until the first load is done.
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.reload()
+            except Exception as e:
+                print(f"Candidate ranking reload failed: {e}")
+            # Until the first load succeeds, retry sooner than the full interval.
+            await asyncio.sleep(self.reload_interval if self.ready else min(self.reload_interval, 5.0))
+
+    async def reload(self):
+        # Picks up writes made by other processes and compacts deleted rows.
+        with self._lock:
+            self._replay = []
+        started = time.perf_counter()
+        try:
+            matrix = await asyncio.to_thread(_Matrix.load)
+        except Exception:
+            with self._lock:
+                self._replay = None
+            raise
+        with self._lock:
+            for update in self._replay:
+                self._apply(matrix, update)
+            self._matrix = matrix
+            self._replay = None
+            self.ready = True
+        CANDIDATE_RANKING_RELOAD_SECONDS.observe(time.perf_counter() - started)
+        print(f"Candidate ranking loaded: {matrix.size} candidates, {len(matrix.columns)} skills")
+
+    @staticmethod
+    def _apply(matrix: _Matrix, update: tuple):
+        kind, *args = update
+        if kind == "upsert":
+            matrix.upsert(*args)
+        elif kind == "delete":
+            matrix.delete(*args)
+        elif kind == "experience":
+            matrix.set_experience(*args)
+
+    def apply(self, updates):
+        # ("upsert", RankingEntry) | ("delete", candidate_id) | ("experience", candidate_id, years)
+        with self._lock:
+            if not self.ready and self._replay is None:
+                return
+            for update in updates:
+                self._apply(self._matrix, update)
+                if self._replay is not None:
+                    self._replay.append(update)
+
+    def rank(
+        self, skills: list[RequiredSkill], min_experience: float | None, work_modes: list[str], limit: int
+    ) -> list[tuple[UUID, int, float]]:
+        if not skills:
+            return []
+        with CANDIDATE_RANKING_SECONDS.time(), self._lock:
+            return self._matrix.rank(skills, min_experience, work_modes, limit)
+
+candidate_ranking = CandidateRanking(CANDIDATE_RANKING_RELOAD_INTERVAL)
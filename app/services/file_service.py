@@ -0,0 +1,115 @@
+import asyncio
+import time
+from uuid import UUID
+import httpx
+from app.core.config import (
+    FILE_SERVICE_URL, FILE_SERVICE_TIMEOUT, FILE_SERVICE_MAX_CONNECTIONS,
+    FILE_LINK_REFRESH_MARGIN, FILE_LINK_DEFAULT_TTL,
+)
+from app.core.metrics import FILE_LINK_REQUESTS
+
+# Client for the file service's signed download links:
+#   GET {FILE_SERVICE_URL}/files/{file_id}/download-url -> {"download_url": ..., "expires_in": seconds}
+# One pooled httpx.AsyncClient is opened at startup. Pass transport=httpx.MockTransport(...)
+# (or point FILE_SERVICE_URL at a local stub) to run without the real service.
+
+class FileServiceError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class FileServiceClient:
+    def __init__(
+        self,
+        base_url: str | None,
+        timeout: float,
+        max_connections: int,
+        refresh_margin: float,
+        default_ttl: float,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.base_url = base_url or ""
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+        self.transport = transport
+        self.client: httpx.AsyncClient | None = None
+        self._links: dict[UUID, tuple[str, float]] = {}
+        self._pending: dict[UUID, asyncio.Future] = {}
+
+    async def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self.transport,
+            )
+            print(f"File service client ready ({self.base_url or 'no FILE_SERVICE_URL'}).")
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+        print("File service client closed.")
+
+    async def get_download_url(self, file_id: UUID) -> str:
+        # Links are reused until refresh_margin before they expire; concurrent
+        # misses for the same file share one request.
+        cached = self._links.get(file_id)
+        if cached is not None and cached[1] > time.monotonic():
+            FILE_LINK_REQUESTS.labels("hit").inc()
+            return cached[0]
+
+        pending = self._pending.get(file_id)
+        if pending is not None:
+            FILE_LINK_REQUESTS.labels("coalesced").inc()
+            return await asyncio.shield(pending)
+
+        FILE_LINK_REQUESTS.labels("miss").inc()
+        task = asyncio.ensure_future(self._fetch(file_id))
+        self._pending[file_id] = task
+        task.add_done_callback(lambda _: self._pending.pop(file_id, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, file_id: UUID) -> str:
+        if self.client is None:
+            raise FileServiceError(503, "File service client is not started")
+        try:
+            response = await self.client.get(f"/files/{file_id}/download-url")
+        except httpx.HTTPError as e:
+            print(f"File service request failed: {e}")
+            raise FileServiceError(502, "File service unavailable")
+        if response.status_code == 404:
+            raise FileServiceError(404, "File not found")
+        if response.is_error:
+            print(f"File service returned {response.status_code} for {file_id}")
+            raise FileServiceError(502, "File service unavailable")
+
+        try:
+            data = response.json()
+            download_url = data["download_url"]
+            expires_in = float(data.get("expires_in") or self.default_ttl)
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"File service returned an unexpected body for {file_id}: {e!r}")
+            raise FileServiceError(502, "File service unavailable")
+        if not isinstance(download_url, str):
+            print(f"File service returned an unexpected body for {file_id}: download_url={download_url!r}")
+            raise FileServiceError(502, "File service unavailable")
+
+        now = time.monotonic()
+        if len(self._links) > 10000:
+            self._links = {key: link for key, link in self._links.items() if link[1] > now}
+        self._links[file_id] = (download_url, now + max(expires_in - self.refresh_margin, 0))
+        return download_url
+
+file_service = FileServiceClient(
+    FILE_SERVICE_URL, FILE_SERVICE_TIMEOUT, FILE_SERVICE_MAX_CONNECTIONS,
+    FILE_LINK_REFRESH_MARGIN, FILE_LINK_DEFAULT_TTL,
+)
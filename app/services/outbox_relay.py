@@ -0,0 +1,103 @@
+import asyncio
+from sqlalchemy import select, delete, func
+from app.core.config import OUTBOX_BATCH_SIZE, OUTBOX_POLL_INTERVAL, OUTBOX_MAX_BACKOFF, OUTBOX_MAX_ATTEMPTS
+from app.core.db import AsyncSessionLocal
+from app.core.metrics import OUTBOX_EVENTS_PARKED
+from app.models.outbox import OutboxEvent
+from app.services.publisher import publisher, RabbitMQProducer
+
+class OutboxRelay:
+    def __init__(
+        self, producer: RabbitMQProducer, batch_size: int, poll_interval: float, max_backoff: float, max_attempts: int
+    ):
+        self.producer = producer
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            print("Outbox relay started.")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        print("Outbox relay stopped.")
+
+    def notify(self):
+        self._wakeup.set()
+
+    async def _run(self):
+        delay = self.poll_interval
+        while True:
+            try:
+                published = await self.drain_once()
+                delay = self.poll_interval
+                if published == self.batch_size:
+                    continue
+            except Exception as e:
+                delay = min(delay * 2, self.max_backoff)
+                print(f"Outbox relay failed, retrying in {delay:.1f}s: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def drain_once(self) -> int:
+        if not self.producer.is_connected:
+            raise RuntimeError("not connected to RabbitMQ")
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(OutboxEvent)
+                .where(OutboxEvent.available_at <= func.now(), OutboxEvent.attempts < self.max_attempts)
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            events = result.scalars().all()
+
+            errors = await self.producer.publish_many(
+                [(event.routing_key, event.body) for event in events]
+            ) if events else []
+
+            published_ids = []
+            error = None
+            for event, event_error in zip(events, errors):
+                if event_error is None:
+                    published_ids.append(event.id)
+                else:
+                    event.attempts += 1
+                    event.last_error = str(event_error)
+                    error = event_error
+                    if event.attempts >= self.max_attempts:
+                        OUTBOX_EVENTS_PARKED.labels(event.routing_key).inc()
+                        print(f"Outbox event {event.id} parked after {event.attempts} attempts: {event_error}")
+
+            if published_ids:
+                await db.execute(
+                    delete(OutboxEvent).where(OutboxEvent.id.in_(published_ids))
+                )
+            await db.commit()
+
+        # Back off only when nothing got through; a partly published batch
+        # means the broker is up and the failed events retry on the next poll.
+        if error is not None and not published_ids:
+            raise error
+        if error is not None:
+            print(f"Outbox relay published {len(published_ids)} of {len(events)} events: {error}")
+        return len(published_ids)
+
+outbox_relay = OutboxRelay(
+    publisher, OUTBOX_BATCH_SIZE, OUTBOX_POLL_INTERVAL, OUTBOX_MAX_BACKOFF, OUTBOX_MAX_ATTEMPTS
+)
@@ -1,45 +1,130 @@
 import asyncio
+import time
 import aio_pika
+from aio_pika.exceptions import DeliveryError
 from app.core.config import (
     RABBITMQ_HOST, RABBITMQ_PORT, RABBITMQ_USER, RABBITMQ_PASS,
-    CANDIDATE_EXCHANGE_NAME
+    CANDIDATE_EXCHANGE_NAME, RABBITMQ_CHANNEL_POOL_SIZE, RABBITMQ_MAX_IN_FLIGHT,
+    RABBITMQ_CONNECT_BACKOFF, RABBITMQ_CONNECT_MAX_BACKOFF,
+)
+from app.core.metrics import (
+    RABBITMQ_CONFIRM_SECONDS, RABBITMQ_PUBLISHED, RABBITMQ_NACKED, RABBITMQ_FAILED
 )
 
 class RabbitMQProducer:
-    def __init__(self):
+    def __init__(self, pool_size: int = RABBITMQ_CHANNEL_POOL_SIZE, max_in_flight: int = RABBITMQ_MAX_IN_FLIGHT):
         self.connection_string = f"amqp://{RABBITMQ_USER}:{RABBITMQ_PASS}@{RABBITMQ_HOST}:{RABBITMQ_PORT}/"
         self.connection = None
         self.channel = None
         self.exchange = None
+        self.pool_size = pool_size
+        self.exchanges = []
+        self._next_exchange = 0
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._connect_task = None
+
+    def start(self, on_connected=None):
+        # Connects in the background so a slow or absent broker doesn't hold up startup.
+        if self._connect_task is None:
+            self._connect_task = asyncio.create_task(self._connect_with_backoff(on_connected))
+
+    async def _connect_with_backoff(self, on_connected):
+        delay = RABBITMQ_CONNECT_BACKOFF
+        while not await self.connect():
+            print(f"Retrying RabbitMQ connection in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RABBITMQ_CONNECT_MAX_BACKOFF)
+        if on_connected is not None:
+            on_connected()
 
-    async def connect(self):
+    async def connect(self) -> bool:
         print("Connecting to RabbitMQ as a producer...")
         try:
             self.connection = await aio_pika.connect_robust(self.connection_string)
-            self.channel = await self.connection.channel()
-            self.exchange = await self.channel.declare_exchange(
-                CANDIDATE_EXCHANGE_NAME, aio_pika.ExchangeType.TOPIC, durable=True
-            )
-            print("Successfully connected to RabbitMQ.")
+            exchanges = []
+            for _ in range(self.pool_size):
+                channel = await self.connection.channel(publisher_confirms=True)
+                exchanges.append(await channel.declare_exchange(
+                    CANDIDATE_EXCHANGE_NAME, aio_pika.ExchangeType.TOPIC, durable=True
+                ))
+            self.exchanges = exchanges
+            self.exchange = exchanges[0]
+            self.channel = self.exchange.channel
+            print(f"Successfully connected to RabbitMQ with {self.pool_size} confirm channels.")
+            return True
         except Exception as e:
             print(f"Failed to connect to RabbitMQ: {e}")
+            # A half-open robust connection would keep reconnecting on its own.
+            connection, self.connection = self.connection, None
+            if connection is not None:
+                try:
+                    await connection.close()
+                except Exception:
+                    pass
+            return False
 
-    async def publish_message(self, routing_key: str, message_body: bytes):
-        if not self.exchange:
-            print("Cannot publish: not connected to RabbitMQ.")
-            return
+    @property
+    def is_connected(self) -> bool:
+        return self.exchange is not None and self.connection is not None and not self.connection.is_closed
 
+    def _pick_exchange(self):
+        exchange = self.exchanges[self._next_exchange % len(self.exchanges)]
+        self._next_exchange += 1
+        return exchange
+
+    async def _publish(self, exchange, routing_key: str, message_body: bytes):
         message = aio_pika.Message(
             body=message_body,
             content_type="application/json",
             delivery_mode=aio_pika.DeliveryMode.PERSISTENT
         )
-        await self.exchange.publish(message, routing_key=routing_key)
+        async with self._in_flight:
+            started = time.perf_counter()
+            try:
+                await exchange.publish(message, routing_key=routing_key)
+            except DeliveryError:
+                RABBITMQ_NACKED.inc()
+                raise
+            except Exception:
+                RABBITMQ_FAILED.inc()
+                raise
+            RABBITMQ_CONFIRM_SECONDS.observe(time.perf_counter() - started)
+        RABBITMQ_PUBLISHED.inc()
+
+    async def publish_message(self, routing_key: str, message_body: bytes):
+        if not self.exchange:
+            print("Cannot publish: not connected to RabbitMQ.")
+            return
+
+        await self._publish(self._pick_exchange(), routing_key, message_body)
         print(f"Published message with routing key '{routing_key}'")
 
+    async def publish_many(self, messages: list[tuple[str, bytes]]) -> list[Exception | None]:
+        # The whole batch goes through one channel so it keeps its order;
+        # confirms are awaited together instead of one round trip per message.
+        if not self.exchange:
+            raise RuntimeError("Cannot publish: not connected to RabbitMQ.")
+
+        exchange = self._pick_exchange()
+        results = await asyncio.gather(
+            *(self._publish(exchange, routing_key, body) for routing_key, body in messages),
+            return_exceptions=True,
+        )
+        errors = [result if isinstance(result, Exception) else None for result in results]
+        failed = sum(error is not None for error in errors)
+        print(f"Published batch of {len(messages)} messages ({failed} failed)")
+        return errors
+
     async def close(self):
+        if self._connect_task is not None:
+            self._connect_task.cancel()
+            try:
+                await self._connect_task
+            except asyncio.CancelledError:
+                pass
+            self._connect_task = None
         if self.connection:
             await self.connection.close()
         print("RabbitMQ producer connection closed.")
 
-publisher = RabbitMQProducer()
\ No newline at end of file
+publisher = RabbitMQProducer()
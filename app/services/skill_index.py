@@ -0,0 +1,114 @@
+import asyncio
+import bisect
+
+from sqlalchemy import select
+
+from app.core.config import SKILL_INDEX_REFRESH_INTERVAL, SKILL_INDEX_RESCAN_WINDOW
+from app.core.db import AsyncSessionLocal
+from app.models.candidate import Skill, SkillAlias
+
+
+def normalize_skill(name: str) -> str:
+    return " ".join(name.split()).lower()
+
+
+# --- SKILL INDEX ---
+class SkillIndex:
+    # Sorted (key, skill_id) pairs for canonical names and aliases; a prefix
+    # lookup is one bisect plus a scan over the matching run.
+    def __init__(self, refresh_interval: float, rescan_window: int = SKILL_INDEX_RESCAN_WINDOW):
+        self.refresh_interval = refresh_interval
+        self.rescan_window = rescan_window
+        self.ready = False
+        self._keys: list[tuple[str, int]] = []
+        self._names: dict[int, str] = {}
+        self._aliases: dict[str, int] = {}
+        self._last_skill_id = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Skill index refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def refresh(self):
+        # Skills are only ever added, so rows from the last seen id on are
+        # fetched, minus a trailing window: serial ids are handed out in insert
+        # order but may commit out of order. Aliases are few and can be
+        # retargeted in place, so they are read in full.
+        async with AsyncSessionLocal() as db:
+            skills = (await db.execute(
+                select(Skill.id, Skill.name, Skill.key)
+                .where(Skill.id > self._last_skill_id - self.rescan_window)
+                .order_by(Skill.id)
+            )).all()
+            aliases = (await db.execute(select(SkillAlias.key, SkillAlias.skill_id))).all()
+        for skill_id, name, key in skills:
+            self.add_skill(skill_id, name, key)
+            self._last_skill_id = max(self._last_skill_id, skill_id)
+        aliases = dict(aliases)
+        for key in self._aliases.keys() - aliases.keys():
+            self.remove_alias(key)
+        for key, skill_id in aliases.items():
+            self.add_alias(key, skill_id)
+        self.ready = True
+
+    def add_skill(self, skill_id: int, name: str, key: str):
+        if skill_id in self._names:
+            return
+        self._names[skill_id] = name
+        bisect.insort(self._keys, (key, skill_id))
+
+    def add_alias(self, key: str, skill_id: int):
+        current = self._aliases.get(key)
+        if current == skill_id:
+            return
+        if current is not None:
+            self.remove_alias(key)
+        self._aliases[key] = skill_id
+        bisect.insort(self._keys, (key, skill_id))
+
+    def remove_alias(self, key: str):
+        skill_id = self._aliases.pop(key, None)
+        if skill_id is not None:
+            del self._keys[bisect.bisect_left(self._keys, (key, skill_id))]
+
+    def lookup(self, name: str) -> int | None:
+        key = normalize_skill(name)
+        i = bisect.bisect_left(self._keys, (key,))
+        if i < len(self._keys) and self._keys[i][0] == key:
+            return self._keys[i][1]
+        return None
+
+    def search(self, prefix: str, limit: int) -> list[dict]:
+        prefix = normalize_skill(prefix)
+        results = []
+        seen = set()
+        start = bisect.bisect_left(self._keys, (prefix,))
+        for i in range(start, len(self._keys)):
+            key, skill_id = self._keys[i]
+            if not key.startswith(prefix) or len(results) >= limit:
+                break
+            if skill_id in seen or skill_id not in self._names:
+                continue
+            seen.add(skill_id)
+            results.append({"id": skill_id, "name": self._names[skill_id]})
+        return results
+
+skill_index = SkillIndex(SKILL_INDEX_REFRESH_INTERVAL)
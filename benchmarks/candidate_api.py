@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import time
+import uuid
+from datetime import date, timedelta
+
+import httpx
+
+from app.core.db import Base, engine
+from app.main import app
+from app.models import candidate as _candidate_models, outbox as _outbox_models  # noqa: F401 (register tables)
+from app.services.candidate_cache import candidate_cache
+from app.services.outbox_relay import outbox_relay
+
+# Drives the FastAPI app in-process against the database from DATABASE_URL,
+# with the broker replaced by InMemoryProducer. Prints one JSON document so
+# runs from different commits can be diffed or compared by a script.
+# Admission control stays on, so requests it sheds are reported as "shed";
+# run with ADMISSION_ENABLED=false to measure the routes without it.
+
+SCENARIOS = ["create", "patch", "read", "all", "avatar"]
+
+
+class InMemoryProducer:
+    def __init__(self):
+        self.messages: list[tuple[str, bytes]] = []
+
+    @property
+    def is_connected(self) -> bool:
+        return True
+
+    async def publish_message(self, routing_key: str, message_body: bytes):
+        self.messages.append((routing_key, message_body))
+
+    async def publish_many(self, messages: list[tuple[str, bytes]]) -> list[Exception | None]:
+        self.messages.extend(messages)
+        return [None] * len(messages)
+
+
+def _candidate_payload(telegram_id: int, args) -> dict:
+    return {
+        "telegram_id": telegram_id,
+        "display_name": f"Bench {telegram_id}",
+        "headline_role": "Backend developer",
+        "experience_years": "3.5",
+        "location": "Berlin",
+        "work_modes": ["remote", "hybrid"],
+        "contacts": {"email": f"{telegram_id}@example.com"},
+        "skills": [
+            {"skill": f"skill-{i}", "kind": "hard", "level": 1 + i % 5} for i in range(args.skills)
+        ],
+        "projects": [
+            {"title": f"project-{i}", "description": "x" * 200, "links": {"repo": "https://example.com"}}
+            for i in range(args.projects)
+        ],
+    }
+
+
+def _patch_payload(iteration: int, args) -> dict:
+    start = date(2015, 1, 1)
+    return {
+        "location": f"City {iteration % 7}",
+        "skills": [
+            {"skill": f"skill-{i}", "kind": "hard", "level": 1 + (i + iteration) % 5} for i in range(args.skills)
+        ],
+        "experiences": [
+            {
+                "company": f"company-{i}",
+                "position": "Engineer",
+                "start_date": (start + timedelta(days=400 * i)).isoformat(),
+                "end_date": None if i == args.experiences - 1 else (start + timedelta(days=400 * i + 380)).isoformat(),
+                "responsibilities": f"iteration {iteration}",
+            }
+            for i in range(args.experiences)
+        ],
+    }
+
+
+def _request_factory(scenario: str, telegram_ids: list[int], next_telegram_id, args):
+    def build(iteration: int) -> tuple[str, str, dict | None]:
+        telegram_id = telegram_ids[iteration % len(telegram_ids)]
+        if scenario == "create":
+            return "POST", "/v1/candidates/", _candidate_payload(next_telegram_id(), args)
+        if scenario == "patch":
+            return "PATCH", f"/v1/candidates/by-telegram/{telegram_id}", _patch_payload(iteration, args)
+        if scenario == "read":
+            return "GET", f"/v1/candidates/by-telegram/{telegram_id}", None
+        if scenario == "all":
+            return "GET", f"/v1/candidates/all?limit={args.page_size}", None
+        if scenario == "avatar":
+            return "PUT", f"/v1/candidates/by-telegram/{telegram_id}/avatar", {"file_id": str(uuid.uuid4())}
+        raise ValueError(scenario)
+    return build
+
+
+async def _run_scenario(client: httpx.AsyncClient, build, args) -> dict:
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(i)
+
+    latencies: list[float] = []
+    queries: list[int] = []
+    errors = 0
+    shed = 0
+
+    async def worker():
+        nonlocal errors, shed
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            method, url, body = build(i)
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            # Admission control sheds with 503 + Retry-After before the route
+            # runs; those are counted apart and kept out of the latency stats.
+            if response.status_code == 503 and "Retry-After" in response.headers:
+                shed += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            queries.append(int(response.headers.get("X-DB-Query-Count", 0)))
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    if len(latencies) < 2:
+        return {"requests": len(latencies), "errors": errors, "shed": shed}
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "shed": shed,
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+        "sql_per_request": round(statistics.fmean(queries), 2),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args):
+    Base.metadata.create_all(engine)
+    outbox_relay.producer = InMemoryProducer()
+    outbox_relay.start()
+    if not args.cache:
+        candidate_cache.ttl = 0
+
+    telegram_id_counter = iter(range(int(time.time() * 1000) * 1000, 2**62))
+    next_telegram_id = lambda: next(telegram_id_counter)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        telegram_ids = []
+        for _ in range(args.candidates):
+            telegram_id = next_telegram_id()
+            response = await client.post("/v1/candidates/", json=_candidate_payload(telegram_id, args))
+            response.raise_for_status()
+            telegram_ids.append(telegram_id)
+
+        results = {}
+        for scenario in args.scenarios:
+            build = _request_factory(scenario, telegram_ids, next_telegram_id, args)
+            results[scenario] = await _run_scenario(client, build, args)
+
+    await outbox_relay.stop()
+    print(json.dumps({
+        "commit": _git_commit(),
+        "config": {key: value for key, value in vars(args).items()},
+        "scenarios": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-process load benchmark for the candidate API")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--candidates", type=int, default=200, help="candidates seeded before the run")
+    parser.add_argument("--skills", type=int, default=20)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--experiences", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--cache", action=argparse.BooleanOptionalAction, default=True)
+    asyncio.run(main(parser.parse_args()))
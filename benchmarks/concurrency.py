@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+import time
+
+import httpx
+
+# Fires concurrent GET /v1/candidates/by-telegram/{id} requests at a running
+# instance and reports throughput. Run it against the service before and after
+# a change with the same --concurrency/--requests to compare req/s.
+
+
+async def _worker(client: httpx.AsyncClient, telegram_ids: list[int], queue: asyncio.Queue, latencies: list[float]):
+    while True:
+        try:
+            i = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        response = await client.get(f"/v1/candidates/by-telegram/{telegram_ids[i % len(telegram_ids)]}")
+        latencies.append(time.perf_counter() - started)
+        if response.status_code >= 500:
+            print(f"Request failed with status {response.status_code}")
+
+
+async def run(base_url: str, telegram_ids: list[int], concurrency: int, total: int):
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    latencies: list[float] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(_worker(client, telegram_ids, queue, latencies) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"requests={total} concurrency={concurrency} elapsed={elapsed:.2f}s")
+    print(f"throughput={total / elapsed:.1f} req/s")
+    print(f"p50={latencies[len(latencies) // 2] * 1000:.1f}ms p99={latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent read throughput for the candidate service")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--telegram-ids", type=int, nargs="+", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.telegram_ids, args.concurrency, args.requests))
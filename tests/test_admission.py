@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+
+from app.core import config
+from app.core.admission import AdmissionMiddleware, Lane, Shed, route_lane
+
+
+class FakePressure:
+    def __init__(self, wait: float = 0.0):
+        self.wait = wait
+
+    def checkout_wait(self) -> float:
+        return self.wait
+
+
+def _lane(concurrency=1, queue_limit=2, queue_budget=1.0, pool_wait_limit=0.5):
+    return Lane("test", concurrency, queue_limit, queue_budget, pool_wait_limit)
+
+
+def test_route_lane():
+    assert route_lane("/v1/candidates/all") == "list"
+    assert route_lane("/v1/candidates/all/") == "list"
+    assert route_lane("/v1/candidates/bulk") == "bulk"
+    assert route_lane("/v1/candidates/by-telegram/1") == "interactive"
+    assert route_lane("/readyz") is None
+
+
+def test_release_hands_slot_to_oldest_waiter():
+    async def run():
+        lane = _lane()
+        pressure = FakePressure()
+        await lane.acquire(pressure)
+        first = asyncio.create_task(lane.acquire(pressure))
+        second = asyncio.create_task(lane.acquire(pressure))
+        await asyncio.sleep(0)
+        assert len(lane._waiters) == 2
+
+        lane.release()
+        await first
+        assert not second.done()
+        assert lane.in_flight == 1
+
+        lane.release()
+        await second
+        lane.release()
+        assert lane.in_flight == 0
+        assert not lane._waiters
+
+    asyncio.run(run())
+
+
+def test_full_queue_sheds():
+    async def run():
+        lane = _lane(queue_limit=1)
+        pressure = FakePressure()
+        await lane.acquire(pressure)
+        waiter = asyncio.create_task(lane.acquire(pressure))
+        await asyncio.sleep(0)
+        with pytest.raises(Shed) as shed:
+            await lane.acquire(pressure)
+        assert shed.value.reason == "queue_full"
+        waiter.cancel()
+
+    asyncio.run(run())
+
+
+def test_queue_timeout_sheds_and_leaves_the_queue():
+    async def run():
+        lane = _lane(queue_budget=0.01)
+        pressure = FakePressure()
+        await lane.acquire(pressure)
+        with pytest.raises(Shed) as shed:
+            await lane.acquire(pressure)
+        assert shed.value.reason == "queue_timeout"
+        assert not lane._waiters
+        lane.release()
+        assert lane.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_is_abandoned():
+    async def run():
+        lane = _lane()
+        pressure = FakePressure()
+        await lane.acquire(pressure)
+        waiter = asyncio.create_task(lane.acquire(pressure))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert not lane._waiters
+        lane.release()
+        assert lane.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_slot_granted_during_abandon_is_passed_on():
+    async def run():
+        lane = _lane()
+        pressure = FakePressure()
+        await lane.acquire(pressure)
+        waiter = asyncio.create_task(lane.acquire(pressure))
+        other = asyncio.create_task(lane.acquire(pressure))
+        await asyncio.sleep(0)
+        # The slot reaches the first waiter in the same step it is cancelled.
+        lane.release()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await other
+        assert lane.in_flight == 1
+        lane.release()
+        assert lane.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_pool_pressure_sheds_before_queueing():
+    async def run():
+        lane = _lane(pool_wait_limit=0.1)
+        with pytest.raises(Shed) as shed:
+            await lane.acquire(FakePressure(wait=0.2))
+        assert shed.value.reason == "pool_wait"
+        assert lane.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_middleware_rejects_with_retry_after():
+    async def app(scope, receive, send):
+        raise AssertionError("request should have been shed")
+
+    async def run():
+        middleware = AdmissionMiddleware(app, pressure=FakePressure(wait=10.0), enabled=True)
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await middleware({"type": "http", "path": "/v1/candidates/all"}, None, send)
+        return sent
+
+    start, body = asyncio.run(run())
+    headers = dict(start["headers"])
+    assert start["status"] == 503
+    assert int(headers[b"retry-after"]) >= 1
+    assert b"pool_wait" in body["body"]
+
+
+def test_per_lane_overrides_merge_into_defaults(monkeypatch):
+    monkeypatch.setenv("TEST_LANES", "list=4")
+    assert config._per_lane("TEST_LANES", "interactive=64,list=8,bulk=2") == {
+        "interactive": 64, "list": 4, "bulk": 2,
+    }
+    monkeypatch.setenv("TEST_LANES", "lists=4")
+    with pytest.raises(ValueError, match="lists"):
+        config._per_lane("TEST_LANES", "interactive=64,list=8,bulk=2")
+
+
+@pytest.mark.parametrize("value, minimum", [("list=0", 1), ("bulk=-1", 0), ("interactive=-0.5", 0)])
+def test_per_lane_rejects_values_below_minimum(monkeypatch, value, minimum):
+    monkeypatch.setenv("TEST_LANES", value)
+    with pytest.raises(ValueError, match="must be at least"):
+        config._per_lane("TEST_LANES", "interactive=64,list=8,bulk=2", minimum=minimum)
@@ -0,0 +1,27 @@
+import uuid
+
+from app.services.candidate_cache import CandidateCache, InMemoryLRUBackend
+
+
+def _cache():
+    return CandidateCache(InMemoryLRUBackend(10), ttl=60, sync_interval=5)
+
+
+def test_store_and_get_by_both_keys():
+    cache = _cache()
+    candidate_id = uuid.uuid4()
+    cache.store(b'{"a":1}', '"1-0"', candidate_id, 42, cache.read_token())
+    assert cache.get_by_id(candidate_id) == (b'{"a":1}', '"1-0"')
+    assert cache.get_by_telegram_id(42) == (b'{"a":1}', '"1-0"')
+
+
+def test_clear_drops_entries_and_reads_started_before_it():
+    cache = _cache()
+    candidate_id = uuid.uuid4()
+    token = cache.read_token()
+    cache.store(b"{}", '"1-0"', candidate_id, 42, token)
+    cache.clear()
+    assert cache.get_by_id(candidate_id) is None
+    # A read that started before the clear may hold a document from before the write.
+    cache.store(b"{}", '"1-0"', candidate_id, 42, token)
+    assert cache.get_by_telegram_id(42) is None
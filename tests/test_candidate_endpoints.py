@@ -0,0 +1,49 @@
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints.candidates import _decode_cursor, _encode_cursor, _etag, _etag_matches, _page_etag
+
+
+def _row(version=1, updated_at=datetime(2024, 5, 1, 12, 30, 0, 123456)):
+    return SimpleNamespace(id=uuid4(), version=version, updated_at=updated_at)
+
+
+def test_etag_changes_with_version_and_update_time():
+    row = _row()
+    assert _etag(row) == _etag(SimpleNamespace(**vars(row)))
+    assert _etag(row) != _etag(_row(version=2))
+    assert _etag(row) != _etag(_row(updated_at=datetime(2024, 5, 1, 12, 30, 0, 123457)))
+
+
+def test_page_etag_depends_on_rows_and_order():
+    first, second = _row(), _row()
+    assert _page_etag([first, second]) == _page_etag([first, second])
+    assert _page_etag([first, second]) != _page_etag([second, first])
+    assert _page_etag([first]) != _page_etag([first, second])
+
+
+def test_etag_matches():
+    etag = '"3-5f1a"'
+    assert _etag_matches(etag, etag)
+    assert _etag_matches(f'"1-aa", W/{etag}', etag)
+    assert _etag_matches(" * ", etag)
+    assert not _etag_matches(None, etag)
+    assert not _etag_matches("", etag)
+    assert not _etag_matches('"3-5f1b"', etag)
+
+
+def test_cursor_round_trip():
+    document = SimpleNamespace(id=uuid4(), created_at=datetime(2024, 5, 1, 12, 30, 0, 123456))
+    cursor = _encode_cursor(document)
+    assert _decode_cursor(cursor) == (document.created_at, document.id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "bm8tc2VwYXJhdG9y", "MjAyNC0wNS0wMXxub3QtYS11dWlk", "//79"])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        _decode_cursor(cursor)
+    assert error.value.status_code == 400
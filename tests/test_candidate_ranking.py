@@ -0,0 +1,75 @@
+from uuid import uuid4
+
+import pytest
+
+from app.services.candidate_ranking import CandidateRanking, RankingEntry, RequiredSkill, _Matrix
+
+PYTHON, SQL, GO = 1, 2, 3
+
+
+def _entry(telegram_id, skills, active=True, experience_years=3, work_modes=("remote",)):
+    return RankingEntry(uuid4(), telegram_id, active, experience_years, list(work_modes), skills)
+
+
+def _ranked(matrix, skills, min_experience=None, work_modes=(), limit=10):
+    return [(telegram_id, round(score, 4)) for _, telegram_id, score in matrix.rank(
+        skills, min_experience, list(work_modes), limit
+    )]
+
+
+def test_rank_scores_weighted_levels():
+    matrix = _Matrix()
+    matrix.upsert(_entry(1, [(PYTHON, 5), (SQL, 2)]))
+    matrix.upsert(_entry(2, [(PYTHON, 2)]))
+    matrix.upsert(_entry(3, [(GO, 4)]))
+    required = [RequiredSkill(PYTHON, 3.0, 4), RequiredSkill(SQL, 1.0, None)]
+    # 1: (3 * 1 + 1) / 4, 2: 3 * (2 / 4) / 4; 3 holds none of the skills.
+    assert _ranked(matrix, required) == [(1, 1.0), (2, 0.375)]
+
+
+def test_rank_filters_and_limit():
+    matrix = _Matrix()
+    matrix.upsert(_entry(1, [(PYTHON, 3)], experience_years=1))
+    matrix.upsert(_entry(2, [(PYTHON, 3)], work_modes=("office",)))
+    matrix.upsert(_entry(3, [(PYTHON, 3)], active=False))
+    matrix.upsert(_entry(4, [(PYTHON, 5)], experience_years=None))
+    required = [RequiredSkill(PYTHON, 1.0, None)]
+    assert {telegram_id for telegram_id, _ in _ranked(matrix, required)} == {1, 2, 4}
+    assert [telegram_id for telegram_id, _ in _ranked(matrix, required, min_experience=2)] == [2]
+    assert {telegram_id for telegram_id, _ in _ranked(matrix, required, work_modes=["remote", "hybrid"])} == {1, 4}
+    assert _ranked(matrix, required, work_modes=["unknown"]) == []
+    assert len(_ranked(matrix, required, limit=2)) == 2
+
+
+def test_upsert_replaces_skills_and_delete_removes_row():
+    matrix = _Matrix()
+    entry = _entry(1, [(PYTHON, 3), (SQL, 3)])
+    matrix.upsert(entry)
+    matrix.upsert(entry._replace(skills=[(GO, 2), (GO, 4)], experience_years=7))
+    assert _ranked(matrix, [RequiredSkill(PYTHON, 1.0, None)]) == []
+    assert _ranked(matrix, [RequiredSkill(GO, 1.0, 4)]) == [(1, 1.0)]
+    assert SQL not in matrix.columns
+
+    matrix.set_experience(entry.id, 2)
+    assert _ranked(matrix, [RequiredSkill(GO, 1.0, None)], min_experience=5) == []
+
+    matrix.delete(entry.id)
+    matrix.delete(entry.id)
+    assert _ranked(matrix, [RequiredSkill(GO, 1.0, None)]) == []
+    assert GO not in matrix.columns
+
+
+def test_matrix_grows_past_initial_capacity():
+    matrix = _Matrix()
+    for telegram_id in range(3000):
+        matrix.upsert(_entry(telegram_id, [(PYTHON, 1 + telegram_id % 5)]))
+    ranked = _ranked(matrix, [RequiredSkill(PYTHON, 1.0, 5)], limit=3000)
+    assert len(ranked) == 3000
+    assert ranked[0][1] == 1.0 and ranked[-1][1] == pytest.approx(0.2)
+
+
+def test_updates_are_ignored_until_first_load():
+    ranking = CandidateRanking(reload_interval=60)
+    ranking.apply([("upsert", _entry(1, [(PYTHON, 3)]))])
+    assert ranking.rank([RequiredSkill(PYTHON, 1.0, None)], None, [], 10) == []
+    assert ranking.rank([], None, [], 10) == []
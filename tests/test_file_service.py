@@ -0,0 +1,136 @@
+import asyncio
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from app.services.file_service import FileServiceClient, FileServiceError
+
+
+def _client(handler, refresh_margin=30.0, default_ttl=300.0):
+    return FileServiceClient(
+        "http://files.test", timeout=1.0, max_connections=4,
+        refresh_margin=refresh_margin, default_ttl=default_ttl, transport=httpx.MockTransport(handler),
+    )
+
+
+def _link_handler(calls, expires_in=600, delay=0.0):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if delay:
+            await asyncio.sleep(delay)
+        file_id = request.url.path.split("/")[2]
+        return httpx.Response(200, json={"download_url": f"https://cdn.test/{file_id}", "expires_in": expires_in})
+    return handler
+
+
+def test_links_are_cached_until_refresh_margin():
+    async def run(expires_in):
+        calls = []
+        client = _client(_link_handler(calls, expires_in=expires_in))
+        await client.start()
+        file_id = uuid4()
+        try:
+            first = await client.get_download_url(file_id)
+            second = await client.get_download_url(file_id)
+        finally:
+            await client.close()
+        assert first == second == f"https://cdn.test/{file_id}"
+        return calls
+
+    assert len(asyncio.run(run(expires_in=600))) == 1
+    # A link expiring within the refresh margin is not reused.
+    assert len(asyncio.run(run(expires_in=10))) == 2
+
+
+def test_concurrent_misses_share_one_request():
+    async def run():
+        calls = []
+        client = _client(_link_handler(calls, delay=0.05))
+        await client.start()
+        file_id = uuid4()
+        try:
+            urls = await asyncio.gather(*(client.get_download_url(file_id) for _ in range(10)))
+        finally:
+            await client.close()
+        return calls, urls
+
+    calls, urls = asyncio.run(run())
+    assert len(calls) == 1
+    assert set(urls) == {urls[0]}
+
+
+@pytest.mark.parametrize("response, status_code", [
+    (httpx.Response(404), 404),
+    (httpx.Response(500), 502),
+    (None, 502),
+])
+def test_errors_map_to_status_codes(response, status_code):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if response is None:
+            raise httpx.ConnectError("refused", request=request)
+        return response
+
+    async def run():
+        client = _client(handler)
+        await client.start()
+        try:
+            await client.get_download_url(uuid4())
+        finally:
+            await client.close()
+
+    with pytest.raises(FileServiceError) as error:
+        asyncio.run(run())
+    assert error.value.status_code == status_code
+
+
+@pytest.mark.parametrize("response", [
+    httpx.Response(200, text="<html>oops</html>"),
+    httpx.Response(200, json={"expires_in": 60}),
+    httpx.Response(200, json={"download_url": "https://cdn.test/file", "expires_in": "soon"}),
+    httpx.Response(200, json={"download_url": None}),
+    httpx.Response(200, json=["https://cdn.test/file"]),
+])
+def test_malformed_body_maps_to_bad_gateway(response):
+    async def run():
+        client = _client(lambda request: response)
+        await client.start()
+        try:
+            await client.get_download_url(uuid4())
+        finally:
+            await client.close()
+
+    with pytest.raises(FileServiceError) as error:
+        asyncio.run(run())
+    assert error.value.status_code == 502
+
+
+def test_failed_fetch_is_not_cached():
+    async def run():
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            if len(calls) == 1:
+                return httpx.Response(503)
+            return httpx.Response(200, json={"download_url": "https://cdn.test/file"})
+
+        client = _client(handler)
+        await client.start()
+        file_id = uuid4()
+        try:
+            with pytest.raises(FileServiceError):
+                await client.get_download_url(file_id)
+            return await client.get_download_url(file_id), calls
+        finally:
+            await client.close()
+
+    url, calls = asyncio.run(run())
+    assert url == "https://cdn.test/file"
+    assert len(calls) == 2
+
+
+def test_not_started_client_reports_unavailable():
+    with pytest.raises(FileServiceError) as error:
+        asyncio.run(_client(_link_handler([])).get_download_url(uuid4()))
+    assert error.value.status_code == 503
@@ -0,0 +1,114 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app import schemas
+from app.crud import candidate as crud_candidate
+from app.models.candidate import SkillKind, Status
+
+CANDIDATES = 20000
+SKILLS = 2000
+
+# Filter values are rare in the seeded data, the way a real search narrows
+# the candidate set, so the planner's choice reflects the indexes rather than
+# a small-table shortcut.
+SEED = [
+    f"""
+    INSERT INTO skills (name, key)
+    SELECT 'Skill ' || i, 'skill ' || i FROM generate_series(1, {SKILLS}) i
+    """,
+    f"""
+    INSERT INTO candidates (
+        id, telegram_id, experience_years, location, work_modes, contacts_visibility, status, created_at
+    )
+    SELECT
+        gen_random_uuid(), i, (i % 200) / 10.0,
+        'city-' || lpad((i % 2000)::text, 5, '0'),
+        CASE WHEN i % 500 = 0 THEN '["remote"]' ELSE '["office"]' END::jsonb,
+        'ON_REQUEST',
+        CASE WHEN i % 500 = 1 THEN 'BLOCKED' ELSE 'ACTIVE' END::status,
+        now() - i * interval '1 minute'
+    FROM generate_series(1, {CANDIDATES}) i
+    """,
+    f"""
+    INSERT INTO candidate_skills (id, candidate_id, skill_id, kind, level)
+    SELECT gen_random_uuid(), c.id, (c.telegram_id * 7 + n * 613) % {SKILLS} + 1, 'HARD', 1 + (c.telegram_id + n) % 5
+    FROM candidates c CROSS JOIN generate_series(0, 2) n
+    """,
+    "ANALYZE",
+]
+
+FILTER_INDEXES = {
+    "ix_candidate_skills_skill_id_level",
+    "ix_candidates_location_trgm",
+    "ix_candidates_status_experience",
+    "ix_candidates_work_modes",
+}
+
+
+@pytest.fixture(scope="module")
+def seeded(pg):
+    for statement in SEED:
+        pg.execute(text(statement))
+    yield pg
+    pg.rollback()
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN " + compiler.process(element.statement, **kw)
+
+
+def _plan(conn, filters: schemas.CandidateSearchFilters) -> str:
+    # The same statement search_candidate_versions runs for the first page.
+    query = crud_candidate._keyset(
+        crud_candidate._version_select().where(*crud_candidate._search_conditions(filters)), 20, None
+    )
+    return "\n".join(conn.execute(_Explain(query)).scalars())
+
+
+@pytest.mark.parametrize("filters, index", [
+    ({"skills": ["skill 42"]}, "ix_candidate_skills_skill_id_level"),
+    ({"skills": ["Skill  42"], "skill_kind": SkillKind.HARD, "min_skill_level": 3}, "ix_candidate_skills_skill_id_level"),
+    ({"skills": ["skill 42", "skill 613"]}, "ix_candidate_skills_skill_id_level"),
+    ({"location": "city-00017"}, "ix_candidates_location_trgm"),
+    ({"status": Status.BLOCKED}, "ix_candidates_status_experience"),
+    ({"status": Status.BLOCKED, "min_experience": Decimal("5"), "max_experience": Decimal("10")},
+     "ix_candidates_status_experience"),
+    ({"work_modes": ["remote"]}, "ix_candidates_work_modes"),
+    ({"work_modes": ["remote", "hybrid"], "status": Status.ACTIVE}, "ix_candidates_work_modes"),
+    ({"location": "city-00017", "status": Status.ACTIVE, "min_experience": Decimal("1")},
+     "ix_candidates_location_trgm"),
+    ({"skills": ["skill 42"], "location": "city-00017", "work_modes": ["remote"], "status": Status.ACTIVE},
+     None),
+])
+def test_search_filters_use_an_index(seeded, filters, index):
+    plan = _plan(seeded, schemas.CandidateSearchFilters(**filters))
+    assert "Seq Scan on candidates" not in plan, plan
+    assert "Seq Scan on candidate_skills" not in plan, plan
+    if index is None:
+        assert any(name in plan for name in FILTER_INDEXES), plan
+    else:
+        assert index in plan, plan
+
+
+@pytest.mark.parametrize("location, found", [
+    ("CITY-00017", 10),
+    ("city-0001_", 0),
+    ("city-%17", 0),
+    ("city-00017%", 0),
+])
+def test_location_filter_matches_a_literal_substring(seeded, location, found):
+    filters = schemas.CandidateSearchFilters(location=location)
+    rows = seeded.execute(crud_candidate._version_select().where(*crud_candidate._search_conditions(filters))).all()
+    assert len(rows) == found
@@ -0,0 +1,53 @@
+from app.services.skill_index import SkillIndex, normalize_skill
+
+
+def _index():
+    index = SkillIndex(refresh_interval=60)
+    index.add_skill(1, "JavaScript", "javascript")
+    index.add_skill(2, "Java", "java")
+    index.add_skill(3, "Go", "go")
+    index.add_skill(4, "Google Cloud", "google cloud")
+    index.add_alias("js", 1)
+    index.add_alias("golang", 3)
+    return index
+
+
+def test_normalize_skill():
+    assert normalize_skill("  Google   Cloud ") == "google cloud"
+
+
+def test_lookup_resolves_names_and_aliases():
+    index = _index()
+    assert index.lookup("JAVA") == 2
+    assert index.lookup(" js ") == 1
+    assert index.lookup("golang") == 3
+    assert index.lookup("jav") is None
+
+
+def test_search_by_prefix():
+    index = _index()
+    assert index.search("ja", 10) == [{"id": 2, "name": "Java"}, {"id": 1, "name": "JavaScript"}]
+    assert index.search("J", 1) == [{"id": 2, "name": "Java"}]
+    assert index.search("rust", 10) == []
+
+
+def test_search_returns_each_skill_once():
+    index = _index()
+    # "go", "golang" and "google cloud" match; golang is an alias of Go.
+    assert index.search("go", 10) == [{"id": 3, "name": "Go"}, {"id": 4, "name": "Google Cloud"}]
+
+
+def test_alias_retarget_and_removal():
+    index = _index()
+    index.add_alias("js", 2)
+    assert index.lookup("js") == 2
+    assert [entry for entry in index._keys if entry[0] == "js"] == [("js", 2)]
+    index.remove_alias("js")
+    assert index.lookup("js") is None
+    assert index.search("js", 10) == []
+
+
+def test_add_skill_is_idempotent():
+    index = _index()
+    index.add_skill(2, "Java", "java")
+    assert index.search("java", 10) == [{"id": 2, "name": "Java"}, {"id": 1, "name": "JavaScript"}]